@@ -0,0 +1,72 @@
+"""
+Client for the Alwrity job API (api_server.py).
+
+RemoteJobClient has the same submit()/get() interface as JobManager, so the
+Streamlit app can hand jobs to a separate API service when ALWRITY_API_URL is
+set instead of running them in its own process.
+"""
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+
+
+logger = logging.getLogger(__name__)
+
+API_URL = os.getenv("ALWRITY_API_URL")
+API_TIMEOUT_SECONDS = float(os.getenv("ALWRITY_API_TIMEOUT", "10"))
+
+
+class RemoteJob:
+    """The snapshot returned when a job is submitted; mirrors Job.id."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.id = snapshot["id"]
+
+
+class RemoteJobClient:
+    """Submits and polls jobs over HTTP."""
+
+    def __init__(self, base_url, token=None, timeout=API_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header("Accept", "application/json")
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as err:
+            try:
+                message = json.loads(err.read().decode("utf-8")).get("error")
+            except (ValueError, AttributeError):
+                message = None
+            if err.code == 404 and method == "GET":
+                return None
+            raise RuntimeError(message or f"Job API returned HTTP {err.code}") from err
+
+    def submit(self, params, secrets=None):
+        """Submit a job; API keys left empty fall back to the server's own keys."""
+        payload = dict(params)
+        payload.update({name: value for name, value in (secrets or {}).items() if value})
+        return RemoteJob(self._request("POST", "/jobs", payload))
+
+    def get(self, job_id):
+        """Return the job snapshot dict, or None if the service does not know the job."""
+        return self._request("GET", f"/jobs/{job_id}")
+
+
+def get_remote_client():
+    """RemoteJobClient for ALWRITY_API_URL, or None when jobs should run in-process."""
+    if not API_URL:
+        return None
+    return RemoteJobClient(API_URL, token=os.getenv("ALWRITY_API_TOKEN"))
@@ -0,0 +1,268 @@
+"""
+HTTP job API for Alwrity.
+
+Runs the blog generation pipeline as background jobs behind a small JSON API,
+so a CMS or other service can use it without the Streamlit app, and so
+generation workers can be scaled separately from UI servers.
+
+Endpoints:
+    POST /jobs               Submit a job; returns 202 with the job snapshot
+    GET  /jobs/{id}          Poll a job's status, progress, partial text and result
+    GET  /jobs/{id}/stream   Server-sent events: progress, delta, reset, translation, done
+    GET  /healthz            Liveness check
+    GET  /metrics            Prometheus metrics
+
+Usage:
+    python api_server.py --port 8600 --workers 8
+
+The server listens on 127.0.0.1 unless --host or ALWRITY_API_HOST says
+otherwise. Set ALWRITY_API_TOKEN to require "Authorization: Bearer <token>".
+API keys may be sent in the request body (metaphor_api_key, gemini_api_key).
+The server's own METAPHOR_API_KEY and GEMINI_API_KEY are used as a fallback
+only when a token is configured, so an open server never spends its quota.
+"""
+import argparse
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from blog_pipeline import run_generation_job
+from job_manager import ACTIVE_STATES, JOB_WORKERS, JobManager
+from metrics import render_prometheus
+
+
+logger = logging.getLogger("alwrity.api")
+
+API_HOST = os.getenv("ALWRITY_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("ALWRITY_API_PORT", "8600"))
+API_TOKEN = os.getenv("ALWRITY_API_TOKEN")
+# How often /stream checks the job for new output
+STREAM_POLL_SECONDS = 0.25
+MAX_BODY_BYTES = 64 * 1024
+# Each extra language is one more Gemini call in the job
+MAX_LANGUAGES = int(os.getenv("ALWRITY_API_MAX_LANGUAGES", "5"))
+
+JOB_DEFAULTS = {
+    "type": "General",
+    "tone": "General",
+    "language": "English",
+    "length": "Short Form (500-800 words)",
+    "parallel_sections": False,
+    "languages": [],
+}
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/stream)?$")
+
+
+class BadRequest(ValueError):
+    """Raised for invalid job submissions; reported as HTTP 400."""
+
+
+def parse_job_request(body):
+    """Split a POST /jobs body into (params, secrets), applying defaults and server keys."""
+    if not isinstance(body, dict):
+        raise BadRequest("Request body must be a JSON object")
+    keywords = str(body.get("keywords") or "").strip()
+    if not keywords:
+        raise BadRequest("keywords are required")
+    params = {"keywords": keywords}
+    for field, default in JOB_DEFAULTS.items():
+        value = body.get(field)
+        if isinstance(default, bool):
+            if value is not None and not isinstance(value, bool):
+                raise BadRequest(f"{field} must be true or false")
+            params[field] = default if value is None else value
+        elif isinstance(default, list):
+            if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+                raise BadRequest(f"{field} must be a list of strings")
+            params[field] = list(dict.fromkeys(item.strip() for item in value or default if item.strip()))
+        else:
+            params[field] = str(value).strip() if value else default
+
+    if len(params["languages"]) > MAX_LANGUAGES:
+        raise BadRequest(f"At most {MAX_LANGUAGES} languages can be requested per job")
+
+    # Server keys are only lent to authenticated callers
+    server_keys = bool(API_TOKEN)
+    secrets = {}
+    for field, env_name, label in (("metaphor_api_key", "METAPHOR_API_KEY", "Metaphor"),
+                                   ("gemini_api_key", "GEMINI_API_KEY", "Gemini")):
+        value = body.get(field)
+        if value is None:
+            value = (server_keys and os.getenv(env_name)) or None
+        elif isinstance(value, str) and value.strip():
+            value = value.strip()
+        else:
+            raise BadRequest(f"{field} must be a non-empty string")
+        if not value:
+            raise BadRequest(f"{label} API Key is not available")
+        secrets[field] = value
+    return params, secrets
+
+
+class _JobAPIHandler(BaseHTTPRequestHandler):
+    server_version = "AlwrityAPI/1.0"
+    job_manager = None
+
+    # --- helpers ---
+
+    def _send_json(self, status, payload, headers=()):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error_json(self, status, message):
+        self._send_json(status, {"error": message})
+
+    def _authorized(self):
+        if not API_TOKEN:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {API_TOKEN}".encode("utf-8")):
+            return True
+        self._send_error_json(401, "Missing or invalid API token")
+        return False
+
+    def _read_json(self):
+        header = (self.headers.get("Content-Length") or "0").strip()
+        if not (header.isascii() and header.isdigit()):
+            raise BadRequest("Content-Length must be a non-negative integer")
+        length = int(header)
+        if length > MAX_BODY_BYTES:
+            raise BadRequest("Request body is too large")
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as err:
+            raise BadRequest(f"Request body is not valid JSON: {err}") from err
+
+    # --- routes ---
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/jobs":
+            self._send_error_json(404, "Not found")
+            return
+        if not self._authorized():
+            return
+        try:
+            params, secrets = parse_job_request(self._read_json())
+        except BadRequest as err:
+            self._send_error_json(400, str(err))
+            return
+        job = self.job_manager.submit(params, secrets)
+        self._send_json(202, job.to_dict(), headers=[("Location", f"/jobs/{job.id}")])
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+            return
+        if path == "/metrics":
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        match = _JOB_PATH.match(path)
+        if not match:
+            self._send_error_json(404, "Not found")
+            return
+        if not self._authorized():
+            return
+        job = self.job_manager.get(match.group(1))
+        if job is None:
+            self._send_error_json(404, "Unknown job")
+        elif match.group(2):
+            self._stream(match.group(1), job)
+        else:
+            self._send_json(200, job)
+
+    def _stream(self, job_id, job):
+        """Send the job's progress as server-sent events until it finishes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(event, data):
+            self.wfile.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        sent_text = ""
+        sent_stage = None
+        sent_translations = set()
+        try:
+            while True:
+                if (job["stage"], job["progress"]) != sent_stage:
+                    sent_stage = (job["stage"], job["progress"])
+                    send("progress", {"status": job["status"], "stage": job["stage"], "progress": job["progress"]})
+                partial = job["partial"] or ""
+                if partial.startswith(sent_text):
+                    if len(partial) > len(sent_text):
+                        send("delta", {"text": partial[len(sent_text):]})
+                else:
+                    # A fallback model restarted the post; the client should drop what it has
+                    send("reset", {})
+                    if partial:
+                        send("delta", {"text": partial})
+                sent_text = partial
+                for language, text in (job.get("translations") or {}).items():
+                    if language not in sent_translations:
+                        sent_translations.add(language)
+                        send("translation", {"language": language, "text": text})
+                if job["status"] not in ACTIVE_STATES:
+                    send("done", job)
+                    return
+                time.sleep(STREAM_POLL_SECONDS)
+                job = self.job_manager.get(job_id) or job
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Stream client for job %s disconnected", job_id)
+
+    def log_message(self, format, *args):
+        logger.info("%s " + format, self.address_string(), *args)
+
+
+def start_api_server(port=API_PORT, host=API_HOST, job_manager=None):
+    """Serve the job API on a background thread; returns the server."""
+    handler = type("JobAPIHandler", (_JobAPIHandler,), {"job_manager": job_manager or JobManager(run_generation_job)})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="api-server", daemon=True)
+    thread.start()
+    logger.info("Serving the Alwrity job API on http://%s:%d", host, server.server_address[1])
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Alwrity blog generation job API.")
+    parser.add_argument("--host", default=API_HOST, help="Interface to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="Jobs that run at the same time")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args(argv)
+    server = start_api_server(args.port, args.host, JobManager(run_generation_job, max_workers=args.workers))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Headless batch generation for Alwrity.
+
+Reads blog requests from a CSV or JSONL file and writes one Markdown post per
+item into an output directory. Finished items are recorded in manifest.jsonl,
+so re-running the same command after a crash skips everything already done.
+
+Usage:
+    python batch_generate.py keywords.csv --output-dir posts --concurrency 8
+
+Each input row needs a "keywords" field and may set "type", "tone",
+"language", "length", "id" and "languages" (extra languages to localize the
+post into, comma-separated in CSV or a list in JSONL).
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from blog_pipeline import generate_localized_blog_posts
+from disk_cache import make_cache_key
+from metrics import start_metrics_server
+
+
+logger = logging.getLogger("alwrity.batch")
+
+MANIFEST_NAME = "manifest.jsonl"
+MAX_FILE_STEM = 100
+ITEM_DEFAULTS = {
+    "type": "General",
+    "tone": "General",
+    "language": "English",
+    "length": "Short Form (500-800 words)",
+}
+
+
+def file_stem(item_id):
+    """A file name for item_id that stays inside the output directory.
+
+    Ids that need changing get a short hash of the original appended, so two
+    ids never map to the same file.
+    """
+    stem = re.sub(r"[^\w.-]", "_", item_id).lstrip(".")[:MAX_FILE_STEM]
+    if stem != item_id:
+        stem = f"{stem}-{make_cache_key(item_id)[:8]}" if stem else make_cache_key(item_id)[:16]
+    return stem
+
+
+def load_items(path):
+    """Read batch items from a .csv or .jsonl file and fill in defaults."""
+    with open(path, encoding="utf-8", newline="") as handle:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in handle if line.strip()]
+        else:
+            rows = list(csv.DictReader(handle))
+
+    items = []
+    for line_number, row in enumerate(rows, start=1):
+        row = {key.strip().lower(): value for key, value in row.items() if key}
+        languages = row.pop("languages", None) or []
+        if isinstance(languages, str):
+            languages = languages.split(",")
+        row = {key: str(value or "").strip() for key, value in row.items()}
+        if not row.get("keywords"):
+            logger.warning("Skipping input row %d: keywords are required", line_number)
+            continue
+        item = {field: row.get(field) or default for field, default in ITEM_DEFAULTS.items()}
+        item["keywords"] = row["keywords"]
+        item["languages"] = [
+            language for language in dict.fromkeys(str(language).strip() for language in languages)
+            if language and language != item["language"]
+        ]
+        # Languages only join the default id when set, so ids from earlier manifests still match
+        item["id"] = row.get("id") or make_cache_key(
+            item["keywords"], item["type"], item["tone"], item["language"], item["length"],
+            *([item["languages"]] if item["languages"] else [])
+        )[:16]
+        items.append(item)
+    return items
+
+
+def load_completed_ids(output_dir):
+    """Return the ids recorded as finished in the manifest of a previous run."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if entry.get("status") == "ok" and os.path.exists(os.path.join(output_dir, entry["file"])):
+                completed.add(entry["id"])
+    return completed
+
+
+class BatchRunner:
+    """Runs batch items concurrently with separate Exa and Gemini limits."""
+
+    def __init__(self, output_dir, metaphor_api_key, gemini_api_key,
+                 concurrency=4, exa_concurrency=2, gemini_concurrency=4, parallel_sections=False):
+        self.output_dir = output_dir
+        self.metaphor_api_key = metaphor_api_key
+        self.gemini_api_key = gemini_api_key
+        self.concurrency = concurrency
+        self.parallel_sections = parallel_sections
+        self.exa_slots = threading.BoundedSemaphore(exa_concurrency)
+        self.gemini_slots = threading.BoundedSemaphore(gemini_concurrency)
+        self.manifest_lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _record(self, entry):
+        with self.manifest_lock:
+            with open(os.path.join(self.output_dir, MANIFEST_NAME), "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def _write_post(self, item, blog_post, language=None):
+        suffix = f".{file_stem(language)}" if language else ""
+        file_name = f"{file_stem(item['id'])}{suffix}.md"
+        path = os.path.join(self.output_dir, file_name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(blog_post)
+        os.replace(tmp_path, path)
+        return file_name
+
+    def run_item(self, item):
+        started = time.perf_counter()
+        languages = item.get("languages") or []
+        entry = {key: item[key] for key in ("id", "keywords", "type", "tone", "language", "length")}
+        entry["languages"] = languages
+        try:
+            posts, errors = generate_localized_blog_posts(
+                item["keywords"], item["type"], item["tone"], item["language"], languages, item["length"],
+                self.metaphor_api_key, self.gemini_api_key, self.parallel_sections,
+                search_slots=self.exa_slots, gemini_slots=self.gemini_slots,
+            )
+            entry["file"] = self._write_post(item, posts.pop(item["language"]))
+            if languages:
+                entry["translations"] = {
+                    language: self._write_post(item, post, language) for language, post in posts.items()
+                }
+            if errors:
+                # Retried on the next run; the cached primary post makes that cheap
+                entry.update(status="error", error="; ".join(f"{language}: {error}" for language, error in errors.items()))
+            else:
+                entry["status"] = "ok"
+        except Exception as err:
+            entry.update(status="error", error=str(err))
+        entry["seconds"] = round(time.perf_counter() - started, 2)
+        self._record(entry)
+        return entry
+
+    def run(self, items):
+        """Generate every item not already completed; returns (succeeded, failed) counts."""
+        completed = load_completed_ids(self.output_dir)
+        pending = {}
+        duplicates = 0
+        for item in items:
+            if item["id"] in pending:
+                # Rows with the same id would race on the same output file
+                duplicates += 1
+            elif item["id"] not in completed:
+                pending[item["id"]] = item
+        pending = list(pending.values())
+        if duplicates:
+            logger.warning("Skipping %d input rows that repeat an earlier id", duplicates)
+        logger.info("%d items, %d already done, %d to generate",
+                    len(items), len(items) - len(pending) - duplicates, len(pending))
+
+        succeeded = failed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self.run_item, item) for item in pending]
+            for future in as_completed(futures):
+                entry = future.result()
+                if entry["status"] == "ok":
+                    succeeded += 1
+                    logger.info("✓ %s (%.1fs) %s", entry["id"], entry["seconds"], entry["keywords"])
+                else:
+                    failed += 1
+                    logger.error("✗ %s %s: %s", entry["id"], entry["keywords"], entry["error"])
+        return succeeded, failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Alwrity blog posts in bulk from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV or JSONL file with keywords, type, tone, language, length, languages columns")
+    parser.add_argument("--output-dir", default="alwrity_posts", help="Directory for posts and manifest.jsonl")
+    parser.add_argument("--concurrency", type=int, default=4, help="Items processed at the same time")
+    parser.add_argument("--exa-concurrency", type=int, default=2, help="Concurrent Exa searches")
+    parser.add_argument("--gemini-concurrency", type=int, default=4, help="Concurrent Gemini calls across all items")
+    parser.add_argument("--parallel-sections", action="store_true",
+                        help="Write Long Detailed posts outline-first with sections generated in parallel")
+    parser.add_argument("--metaphor-api-key", default=os.getenv("METAPHOR_API_KEY"))
+    parser.add_argument("--gemini-api-key", default=os.getenv("GEMINI_API_KEY"))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args(argv)
+    if not args.metaphor_api_key or not args.gemini_api_key:
+        logger.error("Both METAPHOR_API_KEY and GEMINI_API_KEY are required (env or --*-api-key flags).")
+        return 2
+
+    if os.getenv("ALWRITY_METRICS_PORT"):
+        start_metrics_server(int(os.getenv("ALWRITY_METRICS_PORT")))
+
+    runner = BatchRunner(
+        args.output_dir,
+        args.metaphor_api_key,
+        args.gemini_api_key,
+        concurrency=args.concurrency,
+        exa_concurrency=args.exa_concurrency,
+        gemini_concurrency=args.gemini_concurrency,
+        parallel_sections=args.parallel_sections,
+    )
+    succeeded, failed = runner.run(load_items(args.input))
+    logger.info("Finished: %d succeeded, %d failed", succeeded, failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+Load-testing harness for the Alwrity pipeline
+Local Exa and Gemini stand-ins let the pipeline run without spending API quota
+"""
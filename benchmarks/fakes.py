@@ -0,0 +1,160 @@
+"""
+Local stand-ins for the Exa and Gemini clients.
+
+Latency is drawn from a log-normal distribution per model, streaming emits
+chunks at a configurable rate, and 429/503 errors are injected at configurable
+rates. install_fakes() swaps them into client_pool, which is where every
+pipeline module gets its clients from.
+"""
+import math
+import random
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+
+import client_pool
+
+
+class LatencyProfile:
+    """Log-normal latency with a given median (seconds) and spread (sigma)."""
+
+    def __init__(self, median=1.0, sigma=0.5, error_429_rate=0.0, error_503_rate=0.0,
+                 chunks_per_second=20.0, chunk_words=8, response_words=600):
+        self.median = median
+        self.sigma = sigma
+        self.error_429_rate = error_429_rate
+        self.error_503_rate = error_503_rate
+        self.chunks_per_second = chunks_per_second
+        self.chunk_words = chunk_words
+        self.response_words = response_words
+
+    def sample_latency(self, rng):
+        return self.median * math.exp(rng.gauss(0.0, self.sigma))
+
+    def maybe_error(self, rng, model_name):
+        roll = rng.random()
+        if roll < self.error_429_rate:
+            return RuntimeError(f"429 RESOURCE_EXHAUSTED: rate limit exceeded for {model_name}")
+        if roll < self.error_429_rate + self.error_503_rate:
+            return RuntimeError(f"503 UNAVAILABLE: {model_name} is overloaded")
+        return None
+
+
+class _FakeResponse:
+    def __init__(self, text, prompt_tokens, response_tokens):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=response_tokens)
+
+
+class _FakeModels:
+    def __init__(self, profiles, default_profile, seed):
+        self._profiles = profiles
+        self._default = default_profile
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _profile(self, model):
+        return self._profiles.get(model, self._default)
+
+    def _draw(self, profile, model, chunks=1):
+        with self._rng_lock:
+            latency = profile.sample_latency(self._rng)
+            error = profile.maybe_error(self._rng, model)
+            fail_at = self._rng.randrange(chunks) if error else None
+            return latency, error, fail_at
+
+    @staticmethod
+    def _prompt_tokens(contents):
+        return max(1, len(str(contents)) // 4)
+
+    def generate_content(self, model, contents, config=None):
+        profile = self._profile(model)
+        latency, error, _ = self._draw(profile, model)
+        time.sleep(latency)
+        if error:
+            raise error
+        text = " ".join(["lorem"] * profile.response_words)
+        return _FakeResponse(text, self._prompt_tokens(contents), profile.response_words)
+
+    def generate_content_stream(self, model, contents, config=None):
+        profile = self._profile(model)
+        chunks = max(1, profile.response_words // profile.chunk_words)
+        latency, error, fail_at = self._draw(profile, model, chunks)
+        # Time to first token is the sampled latency; the body then streams at the chunk rate
+        time.sleep(latency)
+        for index in range(chunks):
+            if index == fail_at:
+                raise error
+            usage = index == chunks - 1
+            yield _FakeResponse(
+                " ".join(["lorem"] * profile.chunk_words) + " ",
+                self._prompt_tokens(contents) if usage else 0,
+                profile.response_words if usage else 0,
+            )
+            time.sleep(1.0 / profile.chunks_per_second)
+
+    def get(self, model):
+        return SimpleNamespace(name=model)
+
+
+class FakeGeminiClient:
+    """Drop-in for genai.Client exposing models.generate_content(_stream)."""
+
+    def __init__(self, profiles=None, default_profile=None, seed=None):
+        self.models = _FakeModels(profiles or {}, default_profile or LatencyProfile(), seed)
+
+
+class FakeExa:
+    """Drop-in for exa_py.Exa returning synthetic pages after a sampled delay."""
+
+    def __init__(self, profile=None, seed=None, page_words=1500):
+        self.profile = profile or LatencyProfile(median=0.8, sigma=0.3)
+        self.page_words = page_words
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def search_and_contents(self, query, num_results=5, **kwargs):
+        with self._lock:
+            latency = self.profile.sample_latency(self._rng)
+            error = self.profile.maybe_error(self._rng, "exa")
+        time.sleep(latency)
+        if error:
+            raise error
+        words = query.split() or ["topic"]
+        results = []
+        for index in range(num_results):
+            # Filler varies by query and rank so pages are distinct to the research dedupe
+            filler = f"filler{zlib.crc32(f'{query}|{index}'.encode('utf-8')) % 10007}"
+            paragraphs = [
+                " ".join(words[(p + w) % len(words)] if w % 7 == 0 else f"{filler}{w % 11}" for w in range(100))
+                for p in range(self.page_words // 100)
+            ]
+            results.append(SimpleNamespace(
+                id=f"fake-{index}",
+                title=f"{query} - source {index + 1}",
+                url=f"https://example.com/{'-'.join(words)}/{index + 1}",
+                published_date=None,
+                author=None,
+                score=1.0 - index / 10,
+                text="\n\n".join(paragraphs),
+            ))
+        return SimpleNamespace(results=results)
+
+
+def install_fakes(gemini_profiles=None, gemini_default=None, exa_profile=None, seed=None):
+    """Route client_pool to the fakes; returns a callable that restores the real factories."""
+    original = (client_pool.gemini_clients.factory, client_pool.exa_clients.factory)
+    gemini = FakeGeminiClient(gemini_profiles, gemini_default, seed)
+    exa = FakeExa(exa_profile, seed)
+    client_pool.gemini_clients.clear()
+    client_pool.exa_clients.clear()
+    client_pool.gemini_clients.factory = lambda api_key: gemini
+    client_pool.exa_clients.factory = lambda api_key: exa
+
+    def restore():
+        client_pool.gemini_clients.clear()
+        client_pool.exa_clients.clear()
+        client_pool.gemini_clients.factory, client_pool.exa_clients.factory = original
+
+    return restore
@@ -0,0 +1,176 @@
+"""
+Benchmark the Alwrity pipeline against local Exa and Gemini stand-ins.
+
+Examples:
+    python -m benchmarks.run_benchmark --target pipeline --requests 100 --concurrency 16
+    python -m benchmarks.run_benchmark --target llm --lite-503-rate 0.3 --hedge-after 2
+    python -m benchmarks.run_benchmark --target stream --chunks-per-second 40 --json
+
+Caches are bypassed by default so every request exercises the full path;
+pass --allow-cache to measure cache behaviour instead.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from benchmarks.fakes import LatencyProfile, install_fakes
+from blog_pipeline import generate_blog_post
+from circuit_breaker import reset_breakers
+from llm_client import FALLBACK_MODELS, STREAM_RESET, generate_with_fallback, stream_with_fallback
+from model_router import get_router
+from rate_limiter import get_rate_limiter
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _request_fn(target, hedge_after):
+    prompt = "benchmark prompt " * 2000
+
+    def pipeline(index):
+        return generate_blog_post(f"benchmark topic {index} {uuid.uuid4().hex[:6]}", "General", "General", "English",
+                                  "Short Form (500-800 words)", "fake-exa-key", "fake-gemini-key")
+
+    def llm(index):
+        return generate_with_fallback(f"{prompt} {index}", "fake-gemini-key", hedge_after=hedge_after)
+
+    def stream(index):
+        stats = {}
+        text = ""
+        for chunk in stream_with_fallback(f"{prompt} {index}", "fake-gemini-key", stats=stats):
+            text = "" if chunk is STREAM_RESET else text + chunk
+        return stats
+
+    return {"pipeline": pipeline, "llm": llm, "stream": stream}[target]
+
+
+def run_benchmark(target="pipeline", requests=50, concurrency=8, hedge_after=0.0):
+    """Drive the chosen target and return a summary dict."""
+    reset_breakers()
+    get_router().reset()
+    metrics.reset()
+    request = _request_fn(target, hedge_after)
+    latencies = []
+    ttfts = []
+    failures = 0
+
+    def timed(index):
+        started = time.perf_counter()
+        try:
+            result = request(index)
+        except Exception:
+            return None, time.perf_counter() - started
+        return result, time.perf_counter() - started
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for result, seconds in executor.map(timed, range(requests)):
+            if result is None:
+                failures += 1
+                continue
+            latencies.append(seconds)
+            if isinstance(result, dict) and "time_to_first_token" in result:
+                ttfts.append(result["time_to_first_token"])
+    wall_seconds = time.perf_counter() - wall_started
+
+    served = {}
+    reorders = 0
+    for (name, labels), value in metrics.snapshot()["counters"].items():
+        if name == "gemini_requests_served_total":
+            model = dict(labels)["model"]
+            served[model] = served.get(model, 0) + value
+        elif name == "gemini_router_reorders_total":
+            reorders += value
+    successes = sum(served.values())
+    fallback_hits = successes - served.get(FALLBACK_MODELS[0], 0)
+
+    summary = {
+        "target": target,
+        "requests": requests,
+        "concurrency": concurrency,
+        "succeeded": len(latencies),
+        "failed": failures,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(latencies) / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "latency_p99": round(percentile(latencies, 99), 3),
+        "served_by_model": served,
+        "fallback_hit_rate": round(fallback_hits / successes, 3) if successes else 0.0,
+        "router_reorders": reorders,
+    }
+    if ttfts:
+        summary.update(ttft_p50=round(percentile(ttfts, 50), 3), ttft_p99=round(percentile(ttfts, 99), 3))
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Alwrity against local Exa/Gemini fakes.")
+    parser.add_argument("--target", choices=["pipeline", "llm", "stream"], default="pipeline")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hedge-after", type=float, default=0.0, help="Hedge threshold for --target llm (0 = off)")
+    parser.add_argument("--gemini-median", type=float, default=1.0, help="Median Gemini latency in seconds")
+    parser.add_argument("--gemini-sigma", type=float, default=0.5, help="Log-normal spread of Gemini latency")
+    parser.add_argument("--exa-median", type=float, default=0.5, help="Median Exa latency in seconds")
+    parser.add_argument("--error-429-rate", type=float, default=0.0, help="429 rate for every model")
+    parser.add_argument("--error-503-rate", type=float, default=0.0, help="503 rate for every model")
+    parser.add_argument("--lite-503-rate", type=float, default=None,
+                        help=f"Override the 503 rate for {FALLBACK_MODELS[0]} to simulate a degraded primary")
+    parser.add_argument("--chunks-per-second", type=float, default=20.0, help="Streaming chunk rate")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--allow-cache", action="store_true", help="Keep the SERP and result caches enabled")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="Apply the limits configured in ALWRITY_RATE_LIMITS (e.g. free-tier) instead of running unthrottled")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.allow_cache:
+        os.environ["ALWRITY_SERP_CACHE_DISABLED"] = "1"
+        os.environ["ALWRITY_RESULT_CACHE_DISABLED"] = "1"
+    if not args.rate_limits:
+        get_rate_limiter().limits = {}
+
+    def profile(error_503_rate):
+        return LatencyProfile(median=args.gemini_median, sigma=args.gemini_sigma,
+                              error_429_rate=args.error_429_rate, error_503_rate=error_503_rate,
+                              chunks_per_second=args.chunks_per_second)
+
+    gemini_profiles = {}
+    if args.lite_503_rate is not None:
+        gemini_profiles[FALLBACK_MODELS[0]] = profile(args.lite_503_rate)
+    restore = install_fakes(
+        gemini_profiles=gemini_profiles,
+        gemini_default=profile(args.error_503_rate),
+        exa_profile=LatencyProfile(median=args.exa_median, sigma=0.3),
+        seed=args.seed,
+    )
+    try:
+        summary = run_benchmark(args.target, args.requests, args.concurrency, args.hedge_after)
+    finally:
+        restore()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>20}: {value}")
+    return 0 if summary["succeeded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,47 @@
 import os
+import time
 import streamlit as st
-from exa_py import Exa
-from prompts import load_prompt
-from llm_client import generate_with_fallback
+from llm_client import FALLBACK_MODELS
+from blog_pipeline import run_generation_job
+from prompts import is_long_form
+from client_pool import warm_up
+from metrics import start_metrics_server
+from job_manager import JobManager, ACTIVE_STATES, FAILED
+from api_client import API_URL, get_remote_client
+
+
+# How often the page refreshes while a job is still running
+JOB_POLL_SECONDS = 1.0
+LANGUAGE_OPTIONS = ['English', 'Vietnamese', 'Chinese', 'Hindi', 'Spanish']
+
+
+@st.cache_resource
+def warm_up_clients():
+    # Runs once per server process; set ALWRITY_WARMUP=0 to skip. Thin clients never call the APIs.
+    if os.getenv("ALWRITY_WARMUP", "1") != "0" and not API_URL:
+        warm_up(os.getenv('GEMINI_API_KEY'), os.getenv('METAPHOR_API_KEY'), model=FALLBACK_MODELS[0])
+    return True
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    # Prometheus scrape target, shared by every session in this server process
+    port = os.getenv("ALWRITY_METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
+
+
+@st.cache_resource
+def get_job_manager():
+    # With ALWRITY_API_URL set, jobs run on the API service and this app only submits and polls
+    # Otherwise one worker pool per server process, so jobs survive reruns and reconnects
+    return get_remote_client() or JobManager(run_generation_job)
 
 
 def main():
     # Set page configuration
     st.set_page_config(page_title="Alwrity - AI Blog Writer", layout="wide")
+    warm_up_clients()
+    start_metrics_endpoint()
     
     # --- ALwrity Theme: Only use proven working CSS selectors ---
     st.markdown("""
@@ -82,7 +116,7 @@ def main():
             if input_blog_tone == 'Customize':
                 input_blog_tone = st.text_input("Enter your custom blog tone", help="Provide a custom blog tone if you chose 'Customize'.")
         with col3:
-            input_blog_language = st.selectbox('🌐 Language', options=['English', 'Vietnamese', 'Chinese', 'Hindi', 'Spanish', 'Customize'], index=0)
+            input_blog_language = st.selectbox('🌐 Language', options=LANGUAGE_OPTIONS + ['Customize'], index=0)
             if input_blog_language == 'Customize':
                 input_blog_language = st.text_input("Enter your custom language", help="Provide a custom language if you chose 'Customize'.")
         with col4:
@@ -92,71 +126,133 @@ def main():
                 index=0,  # Default to Short Form
                 help="Choose the length of your blog post"
             )
+            parallel_sections = False
+            if is_long_form(blog_length):
+                parallel_sections = st.checkbox(
+                    '⚡ Write sections in parallel',
+                    value=True,
+                    help="Plan an outline first, then write all sections at the same time. Much faster for long posts."
+                )
+
+        extra_languages = st.multiselect(
+            '🌍 Also publish in',
+            options=[language for language in LANGUAGE_OPTIONS if language != input_blog_language],
+            help="The post is researched and written once, then localized into these languages at the same time, including the SEO metadata."
+        )
 
         # Generate Blog Button
         if st.button('**Write Blog Post ✍️**'):
-            with st.spinner('Generating your blog post...'):
-                if not input_blog_keywords:
-                    st.error('**🫣 Provide Inputs to generate Blog Post. Keywords are required!**')
-                else:
-                    metaphor_api_key = user_metaphor_api_key or os.getenv('METAPHOR_API_KEY')
-                    gemini_api_key = user_gemini_api_key or os.getenv('GEMINI_API_KEY')
-                    if not metaphor_api_key:
-                        st.error("❌ Metaphor API Key is not available! Please provide your API key in the API Configuration section.")
-                        return
-                    if not gemini_api_key:
-                        st.error("❌ Gemini API Key is not available! Please provide your API key in the API Configuration section.")
-                        return
-                    try:
-                        blog_post = generate_blog_post(input_blog_keywords, blog_type, input_blog_tone, input_blog_language, blog_length, metaphor_api_key, gemini_api_key)
-                        if blog_post:
-                            st.subheader('**👩🧕🔬 Your Final Blog Post!**')
-                            st.write(blog_post)
-                        else:
-                            st.error("💥 Failed to generate blog post. Please try again!")
-                    except Exception as e:
-                        if "quota exceeded" in str(e).lower():
-                            st.error("❌ API limit exceeded! Please provide your own API key in the API Configuration section.")
-                        else:
-                            st.error("💥 Gemini is busy right now. Please try again in a minute.")
-
-
-# Function to generate the blog post using the LLM
-def generate_blog_post(input_blog_keywords, input_type, input_tone, input_language, blog_length, metaphor_api_key, gemini_api_key):
-    serp_results = None
-    try:
-        serp_results = metaphor_search_articles(input_blog_keywords, metaphor_api_key)
-    except Exception as err:
-        st.error(f"❌ Failed to retrieve search results for {input_blog_keywords}: {err}")
-    
-    if serp_results:
-        # Load appropriate prompt based on blog length selection
-        prompt = load_prompt(blog_length, input_type, input_tone, input_language, input_blog_keywords, serp_results)
-        return generate_text_with_exception_handling(prompt, gemini_api_key)
-    return None
+            if not input_blog_keywords:
+                st.error('**🫣 Provide Inputs to generate Blog Post. Keywords are required!**')
+                return
+            metaphor_api_key = user_metaphor_api_key or os.getenv('METAPHOR_API_KEY')
+            gemini_api_key = user_gemini_api_key or os.getenv('GEMINI_API_KEY')
+            # A remote job service may use its own keys, so only the in-process runner needs them here
+            if not metaphor_api_key and not API_URL:
+                st.error("❌ Metaphor API Key is not available! Please provide your API key in the API Configuration section.")
+                return
+            if not gemini_api_key and not API_URL:
+                st.error("❌ Gemini API Key is not available! Please provide your API key in the API Configuration section.")
+                return
+            # Generation runs in the background; reruns only poll the job
+            try:
+                job = get_job_manager().submit(
+                    {
+                        'keywords': input_blog_keywords,
+                        'type': blog_type,
+                        'tone': input_blog_tone,
+                        'language': input_blog_language,
+                        'length': blog_length,
+                        'parallel_sections': parallel_sections,
+                        'languages': extra_languages,
+                    },
+                    {'metaphor_api_key': metaphor_api_key, 'gemini_api_key': gemini_api_key},
+                )
+            except (RuntimeError, OSError) as err:
+                st.error(f"❌ Could not start the job: {err}")
+                return
+            job_ids = st.session_state.setdefault('job_ids', [])
+            if job.id not in job_ids:
+                job_ids.append(job.id)
 
+    render_jobs()
 
-# Metaphor search function
-def metaphor_search_articles(query, api_key):
-    if not api_key:
-        raise ValueError("Metaphor API Key is missing!")
 
-    metaphor = Exa(api_key)
-    
+def render_jobs():
+    """Show this session's jobs, newest first, refreshing while any is still running."""
+    job_ids = st.session_state.get('job_ids', [])
+    if not job_ids:
+        return
     try:
-        search_response = metaphor.search_and_contents(query, num_results=5)
-        return search_response.results
-    except Exception as err:
-        st.error(f"Failed in metaphor.search_and_contents: {err}")
-        return None
+        jobs = [job for job in (get_job_manager().get(job_id) for job_id in reversed(job_ids)) if job]
+    except (RuntimeError, OSError) as err:
+        st.error(f"❌ The job service is unavailable: {err}")
+        return
+    for job in jobs:
+        render_job(job)
+    if any(job['status'] in ACTIVE_STATES for job in jobs):
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
 
 
-def generate_text_with_exception_handling(prompt, api_key):
-    try:
-        return generate_with_fallback(prompt, api_key)
-    except Exception as e:
-        st.error(f"❌ Blog generation failed after fallback attempts: {e}")
-        return None
+def render_job(job):
+    st.subheader('**👩🧕🔬 Your Final Blog Post!**')
+    st.caption(f"📝 {job['params']['keywords']}")
+    if job['status'] in ACTIVE_STATES:
+        st.progress(min(job['progress'], 1.0), text=job['stage'])
+        if job['partial']:
+            st.markdown(job['partial'] + "▌")
+        return
+    if job['status'] == FAILED:
+        render_job_error(job['error'] or "")
+        return
+
+    translations = job.get('translations') or {}
+    if translations:
+        languages = [job['params']['language'], *translations]
+        for tab, language in zip(st.tabs(languages), languages):
+            with tab:
+                st.markdown(job['result'] if language == job['params']['language'] else translations[language])
+    else:
+        st.markdown(job['result'])
+    for language, error in (job.get('translation_errors') or {}).items():
+        st.warning(f"⚠️ Could not localize the post into {language}: {error}")
+    stats = job['stats']
+    generation = stats.get('generation') or {}
+    if generation.get('cached'):
+        st.caption(f"♻️ Reused an identical post from the {generation['model']}.")
+    elif generation:
+        st.caption(
+            f"⏱️ First words after {generation['time_to_first_token']:.1f}s · "
+            f"finished in {generation['total_seconds']:.1f}s with {generation['model']}"
+        )
+        route = generation.get('route')
+        if route and route['reordered']:
+            st.caption(f"🧭 Tried {route['order'][0]} first based on recent model latency.")
+    report = stats.get('research')
+    if report:
+        st.caption(
+            f"🧹 Research context: {report['compacted_tokens']:,} tokens "
+            f"(saved ~{report['saved_tokens']:,} tokens from {stats['sources']} sources)"
+        )
+    sources_report = stats.get('sources_report')
+    if sources_report:
+        removed = sources_report['url_duplicates'] + sources_report['near_duplicates']
+        st.caption(
+            f"🔎 {stats['sources']} distinct sources from {len(sources_report['queries'])} searches "
+            f"({removed} duplicate pages removed)"
+        )
+    if stats.get('outline_error'):
+        st.caption(f"Outline unavailable ({stats['outline_error']}); the post was written in one pass.")
+
+
+def render_job_error(error):
+    if "quota exceeded" in error.lower():
+        st.error("❌ API limit exceeded! Please provide your own API key in the API Configuration section.")
+    elif error.startswith("Failed to retrieve search results"):
+        st.error(f"❌ {error}")
+    else:
+        st.error("💥 Gemini is busy right now. Please try again in a minute.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+"""
+Streamlit-free blog generation pipeline: search -> compact -> prompt -> generate.
+Used by the Streamlit app and the batch CLI; errors are raised, not rendered.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from prompts import load_prompt, compact_serp_results, is_long_form
+from llm_client import STREAM_RESET
+from result_cache import generate_cached, stream_cached
+from disk_cache import DiskCache, make_cache_key
+from client_pool import get_exa_client
+from rate_limiter import get_rate_limiter
+from long_form import generate_long_blog_parallel
+from localization import localize_blog_posts
+from research import expand_queries, interleave_results, dedupe_results
+
+
+logger = logging.getLogger(__name__)
+
+
+SERP_NUM_RESULTS = 5
+SERP_RESULT_FIELDS = ("id", "title", "url", "published_date", "author", "score", "text")
+
+# Exa responses are cached on disk so repeat topics skip the search round-trip.
+# Set ALWRITY_SERP_CACHE_TTL=0 to disable expiry, ALWRITY_SERP_CACHE_DISABLED=1 to bypass it.
+serp_cache = DiskCache(
+    "serp_results",
+    ttl_seconds=int(os.getenv("ALWRITY_SERP_CACHE_TTL", str(24 * 3600))),
+    max_entries=int(os.getenv("ALWRITY_SERP_CACHE_MAX_ENTRIES", "500")),
+)
+
+
+def _normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def _result_to_dict(result):
+    return {field: getattr(result, field, None) for field in SERP_RESULT_FIELDS}
+
+
+# Metaphor search function
+def metaphor_search_articles(query, api_key, num_results=SERP_NUM_RESULTS):
+    if not api_key:
+        raise ValueError("Metaphor API Key is missing!")
+
+    with metrics.timed_stage("search") as stage:
+        use_cache = os.getenv("ALWRITY_SERP_CACHE_DISABLED") != "1"
+        cache_key = make_cache_key("search_and_contents", _normalize_query(query), num_results)
+        if use_cache:
+            cached = serp_cache.get(cache_key)
+            metrics.record_cache("serp", bool(cached))
+            if cached:
+                stage.update(cached=True, results=len(cached))
+                return cached
+
+        # No-op unless an "exa" limit is set in ALWRITY_RATE_LIMITS
+        get_rate_limiter().acquire(api_key, "exa")
+        metaphor = get_exa_client(api_key)
+        search_response = metaphor.search_and_contents(query, num_results=num_results)
+        results = [_result_to_dict(result) for result in search_response.results]
+        stage.update(cached=False, results=len(results))
+
+        if use_cache and results:
+            serp_cache.set(cache_key, results)
+        return results
+
+
+def research_topic(input_blog_keywords, api_key, input_type=None, search_slots=None):
+    """Search the topic and its sub-queries concurrently and drop duplicate pages.
+
+    Returns the distinct results and a report with the queries used and how
+    many results were fetched, found to be duplicates and kept. Failed
+    sub-queries are skipped; the error is raised only if every query fails.
+    search_slots, when given, is a semaphore held around each Exa search so
+    callers can bound concurrent searches across topics.
+    """
+    queries = expand_queries(input_blog_keywords, input_type)
+
+    def search(query):
+        if search_slots is None:
+            return metaphor_search_articles(query, api_key)
+        with search_slots:
+            return metaphor_search_articles(query, api_key)
+
+    with metrics.timed_stage("research", queries=len(queries)) as stage, \
+            ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="research") as executor:
+        futures = [executor.submit(search, query) for query in queries]
+        result_lists, errors = [], []
+        for query, future in zip(queries, futures):
+            try:
+                result_lists.append(future.result())
+            except Exception as err:
+                logger.warning("Search for %r failed: %s", query, err)
+                errors.append(err)
+        if not result_lists:
+            raise errors[0]
+
+        fetched = interleave_results(result_lists)
+        results, report = dedupe_results(fetched)
+        report.update(queries=queries, fetched=len(fetched), kept=len(results), failed_queries=len(errors))
+        stage.update(fetched=len(fetched), kept=len(results))
+    metrics.increment("alwrity_research_duplicates_total", report['url_duplicates'], kind="url")
+    metrics.increment("alwrity_research_duplicates_total", report['near_duplicates'], kind="near")
+    return results, report
+
+
+def prepare_prompt(input_blog_keywords, input_type, input_tone, input_language, blog_length, serp_results):
+    """Compact the search results and load the prompt for the selected blog length.
+
+    Returns the prompt and the compaction report.
+    """
+    with metrics.timed_stage("prompt") as stage:
+        serp_context, report = compact_serp_results(serp_results, input_blog_keywords, blog_length)
+        prompt = load_prompt(blog_length, input_type, input_tone, input_language, input_blog_keywords, serp_context)
+        stage.update(report)
+    metrics.increment("alwrity_serp_tokens_saved_total", report['saved_tokens'])
+    return prompt, report
+
+
+def generate_blog_post(input_blog_keywords, input_type, input_tone, input_language, blog_length, metaphor_api_key, gemini_api_key,
+                       parallel_sections=False, search_slots=None, gemini_slots=None):
+    """Run the full pipeline and return the generated post.
+
+    With parallel_sections, Long Detailed posts are written outline-first with
+    sections generated concurrently, falling back to one call if the outline fails.
+    search_slots and gemini_slots, when given, are semaphores held around each
+    Exa search and each Gemini call, so callers can bound them across posts.
+    """
+    serp_results, _ = research_topic(input_blog_keywords, metaphor_api_key, input_type, search_slots=search_slots)
+    if not serp_results:
+        raise RuntimeError(f"No search results found for {input_blog_keywords!r}")
+    if parallel_sections and is_long_form(blog_length):
+        try:
+            return generate_long_blog_parallel(input_blog_keywords, input_type, input_tone, input_language, serp_results,
+                                               gemini_api_key, gemini_slots=gemini_slots)
+        except ValueError as err:
+            logger.warning("Parallel long form unavailable for %r, using single prompt: %s", input_blog_keywords, err)
+    prompt, _ = prepare_prompt(input_blog_keywords, input_type, input_tone, input_language, blog_length, serp_results)
+    return generate_cached(prompt, gemini_api_key, gemini_slots=gemini_slots)
+
+
+def generate_localized_blog_posts(input_blog_keywords, input_type, input_tone, input_language, languages, blog_length,
+                                  metaphor_api_key, gemini_api_key, parallel_sections=False, search_slots=None,
+                                  gemini_slots=None):
+    """Write the post once in input_language, then localize it into each of languages concurrently.
+
+    Returns (posts, errors) keyed by language; posts always holds input_language.
+    search_slots and gemini_slots work as in generate_blog_post.
+    """
+    blog_post = generate_blog_post(input_blog_keywords, input_type, input_tone, input_language, blog_length,
+                                   metaphor_api_key, gemini_api_key, parallel_sections,
+                                   search_slots=search_slots, gemini_slots=gemini_slots)
+    posts, errors = localize_blog_posts(blog_post, input_blog_keywords, input_language, languages, gemini_api_key,
+                                        gemini_slots=gemini_slots)
+    return {input_language: blog_post, **posts}, errors
+
+
+def run_generation_job(job):
+    """Job runner for job_manager: runs the pipeline and reports progress into the job.
+
+    job.params holds keywords, type, tone, language, length, parallel_sections
+    and optionally languages (extra languages to localize into); job.secrets
+    holds metaphor_api_key and gemini_api_key.
+    """
+    blog_post = _write_primary_post(job)
+    languages = [language for language in job.params.get('languages') or () if language != job.params['language']]
+    if languages:
+        # Show the finished primary post while the other languages are written
+        job.reset_partial()
+        job.append(blog_post)
+        job.set_stage(f"Localizing into {', '.join(languages)}...", 0.9)
+        done = []
+
+        def on_result(language, post, error):
+            done.append(language)
+            job.add_translation(language, post, error)
+            job.set_stage(f"Localizing... {len(done)}/{len(languages)}", 0.9 + 0.1 * len(done) / len(languages))
+
+        localize_blog_posts(blog_post, job.params['keywords'], job.params['language'], languages,
+                            job.secrets['gemini_api_key'], on_result=on_result)
+    return blog_post
+
+
+def _write_primary_post(job):
+    """Research and write the post in the job's primary language."""
+    params = job.params
+    keywords = params['keywords']
+    job.set_stage("Researching your topic...", 0.05)
+    try:
+        serp_results, sources_report = research_topic(keywords, job.secrets['metaphor_api_key'], params['type'])
+    except Exception as err:
+        raise RuntimeError(f"Failed to retrieve search results for {keywords}: {err}") from err
+    if not serp_results:
+        raise RuntimeError(f"Failed to retrieve search results for {keywords}: no results")
+    job.update_stats(sources=len(serp_results), sources_report=sources_report)
+
+    inputs = (keywords, params['type'], params['tone'], params['language'])
+    if params.get('parallel_sections') and is_long_form(params['length']):
+        job.set_stage("Planning the outline...", 0.1)
+
+        def on_progress(done, total):
+            job.set_stage(f"Writing sections in parallel... {done}/{total}", 0.1 + 0.9 * done / total)
+
+        try:
+            return generate_long_blog_parallel(*inputs, serp_results, job.secrets['gemini_api_key'], on_progress=on_progress)
+        except ValueError as err:
+            # Outline could not be parsed; write the post in one streamed call instead
+            job.update_stats(outline_error=str(err))
+
+    prompt, report = prepare_prompt(*inputs, params['length'], serp_results)
+    job.update_stats(research=report)
+    job.set_stage("Writing your blog post...", 0.2)
+    stats = {}
+    chunks = []
+    for chunk in stream_cached(prompt, job.secrets['gemini_api_key'], stats=stats):
+        if chunk is STREAM_RESET:
+            # The model failed partway; the next fallback model starts over
+            chunks = []
+            job.reset_partial()
+        else:
+            chunks.append(chunk)
+            job.append(chunk)
+    job.update_stats(generation=stats)
+    return "".join(chunks)
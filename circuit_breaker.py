@@ -0,0 +1,134 @@
+"""
+Per-model circuit breakers for Gemini calls.
+A model whose recent error rate is too high is skipped for a cool-down period,
+then a single probe request decides whether it is healthy again.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import metrics
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the model's circuit is open."""
+
+
+class CircuitBreaker:
+    """Tracks recent outcomes for one model and opens on a high error rate."""
+
+    def __init__(self, name, error_rate=0.5, min_requests=4, window_seconds=60.0, cooldown_seconds=30.0):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._outcomes = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        self._state = state
+        metrics.set_gauge("gemini_circuit_state", _STATE_VALUES[state], model=self.name)
+        if state == OPEN:
+            metrics.increment("gemini_circuit_opened_total", model=self.name)
+
+    def _refresh(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+        if self._state == OPEN and now - self._opened_at >= self.cooldown_seconds:
+            self._set_state(HALF_OPEN)
+            self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def available(self):
+        """True unless the circuit is open; does not reserve the half-open probe."""
+        return self.state != OPEN
+
+    def allow(self):
+        """Reserve permission for one call; False means skip this model for now."""
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            metrics.increment("gemini_circuit_rejected_total", model=self.name)
+            return False
+
+    def release(self):
+        """Give back a reserved half-open probe without recording an outcome.
+
+        Used when the probe ended for a reason that says nothing about the
+        model's health (a non-transient error, or the caller gave up), so the
+        next request can probe instead.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, True))
+            self._refresh(now)
+            if self._state != CLOSED:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            self._outcomes.append((now, False))
+            self._refresh(now)
+            if self._state == HALF_OPEN:
+                self._opened_at = now
+                self._set_state(OPEN)
+                return
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            total = len(self._outcomes)
+            if self._state == CLOSED and total >= self.min_requests and failures / total >= self.error_rate:
+                self._opened_at = now
+                self._set_state(OPEN)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model_name):
+    """Return the shared breaker for a model, configured from ALWRITY_BREAKER_* env vars."""
+    with _breakers_lock:
+        breaker = _breakers.get(model_name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                model_name,
+                error_rate=float(os.getenv("ALWRITY_BREAKER_ERROR_RATE", "0.5")),
+                min_requests=int(os.getenv("ALWRITY_BREAKER_MIN_REQUESTS", "4")),
+                window_seconds=float(os.getenv("ALWRITY_BREAKER_WINDOW_SECONDS", "60")),
+                cooldown_seconds=float(os.getenv("ALWRITY_BREAKER_COOLDOWN_SECONDS", "30")),
+            )
+            _breakers[model_name] = breaker
+        return breaker
+
+
+def reset_breakers():
+    """Forget all breaker state, e.g. between benchmark runs."""
+    with _breakers_lock:
+        _breakers.clear()
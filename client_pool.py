@@ -0,0 +1,108 @@
+"""
+Process-wide registry of Gemini and Exa clients keyed by API key.
+
+Imported modules survive Streamlit reruns, so every session in the process
+shares these clients, and the Gemini client's keep-alive connections (the Exa
+SDK opens a new connection per request regardless). The registry
+is bounded and drops clients that have been idle for too long. Dropped clients
+are not closed, because another thread may still be generating with one; its
+connections are released when the last user lets go of it.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from exa_py import Exa
+from google import genai
+
+
+logger = logging.getLogger(__name__)
+
+CLIENT_POOL_MAX_SIZE = int(os.getenv("ALWRITY_CLIENT_POOL_MAX_SIZE", "32"))
+CLIENT_POOL_IDLE_SECONDS = float(os.getenv("ALWRITY_CLIENT_POOL_IDLE_SECONDS", "900"))
+
+
+def _close_client(client):
+    close = getattr(client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as err:
+            logger.debug("Ignoring error while closing %r: %s", client, err)
+
+
+class ClientRegistry:
+    """Bounded LRU of clients built by factory(api_key), evicting idle entries."""
+
+    def __init__(self, factory, max_size=CLIENT_POOL_MAX_SIZE, idle_seconds=CLIENT_POOL_IDLE_SECONDS):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_key):
+        # Keys are hashed so raw secrets never show up in debug output
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def _evict(self, now):
+        for key, (_, last_used) in list(self._clients.items()):
+            if self.idle_seconds and now - last_used > self.idle_seconds:
+                del self._clients[key]
+        while len(self._clients) > self.max_size:
+            self._clients.popitem(last=False)
+
+    def get(self, api_key):
+        """Return the shared client for api_key, creating it on first use."""
+        key = self._key(api_key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._clients.pop(key, None)
+            client = entry[0] if entry else self.factory(api_key)
+            self._clients[key] = (client, now)
+            self._evict(now)
+        return client
+
+    def clear(self):
+        """Drop and close every client; only call when no generation is running."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            _close_client(client)
+
+    def __len__(self):
+        return len(self._clients)
+
+
+gemini_clients = ClientRegistry(lambda api_key: genai.Client(api_key=api_key))
+exa_clients = ClientRegistry(Exa)
+
+
+def get_gemini_client(api_key):
+    return gemini_clients.get(api_key)
+
+
+def get_exa_client(api_key):
+    return exa_clients.get(api_key)
+
+
+def warm_up(gemini_api_key=None, exa_api_key=None, model=None):
+    """Create clients ahead of the first request and open the Gemini connection.
+
+    Fetching model metadata is a cheap call that completes the TLS handshake,
+    so the first real generation reuses an established connection.
+    """
+    if exa_api_key:
+        get_exa_client(exa_api_key)
+    if gemini_api_key:
+        client = get_gemini_client(gemini_api_key)
+        if model:
+            try:
+                client.models.get(model=model)
+            except Exception as err:
+                logger.warning("Gemini warm-up request failed: %s", err)
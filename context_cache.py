@@ -0,0 +1,83 @@
+"""
+Gemini context caches for the static prefix of structured prompts.
+
+Every request built from the same template shares one instruction prefix.
+When ALWRITY_CONTEXT_CACHE=1, that prefix is uploaded once per (API key,
+model) as cached content, and later requests send only the per-request suffix.
+The prefix also comes first in the plain-text prompt, so Gemini's implicit
+prefix caching can apply even with explicit caching turned off.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from google.genai import types
+
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_CACHE_ENABLED = os.getenv("ALWRITY_CONTEXT_CACHE", "0") == "1"
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("ALWRITY_CONTEXT_CACHE_TTL", "3600"))
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def _entry_key(api_key, model_name, prompt):
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16], model_name, prompt.prefix_hash
+
+
+def get_cached_content(client, api_key, model_name, prompt):
+    """Return the cached content name for the prompt's prefix, creating it if needed.
+
+    Returns None when caching is disabled, the prompt has no static prefix,
+    or Gemini refused to cache it (e.g. the prefix is below the model's
+    minimum cacheable size). Refusals are remembered for one TTL.
+    """
+    if not CONTEXT_CACHE_ENABLED or getattr(prompt, "prefix_hash", None) is None:
+        return None
+    key = _entry_key(api_key, model_name, prompt)
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+    if entry and entry[1] > now:
+        return entry[0]
+
+    try:
+        cache = client.caches.create(
+            model=model_name,
+            config=types.CreateCachedContentConfig(
+                contents=[prompt.prefix],
+                ttl=f"{CONTEXT_CACHE_TTL_SECONDS}s",
+                display_name=f"alwrity-{prompt.template_name}",
+            ),
+        )
+        name = cache.name
+        # Expire locally a little early so we never reference a cache Gemini already dropped
+        expires_at = now + CONTEXT_CACHE_TTL_SECONDS - 60
+    except Exception as err:
+        logger.info("Context cache unavailable for %s (%s); sending full prompts", model_name, err)
+        name = None
+        expires_at = now + CONTEXT_CACHE_TTL_SECONDS
+    with _lock:
+        _entries[key] = (name, expires_at)
+    return name
+
+
+def invalidate_on_error(api_key, model_name, prompt, err):
+    """Forget the cached content for a prompt's prefix if Gemini reports it missing or expired."""
+    message = str(err).lower()
+    if getattr(prompt, "prefix_hash", None) is None or ("cache" not in message and "404" not in message):
+        return
+    with _lock:
+        _entries.pop(_entry_key(api_key, model_name, prompt), None)
+
+
+def request_args(client, api_key, model_name, prompt):
+    """Build the contents/config kwargs for generate_content(_stream)."""
+    cache_name = get_cached_content(client, api_key, model_name, prompt)
+    if cache_name:
+        return {"contents": prompt.suffix, "config": types.GenerateContentConfig(cached_content=cache_name)}
+    return {"contents": str(prompt)}
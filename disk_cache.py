@@ -0,0 +1,107 @@
+"""
+SQLite-backed key/value cache shared by every Streamlit session and process on a host.
+Entries expire after a TTL and the table is trimmed to a maximum size in LRU order.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "ALWRITY_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "alwrity_cache.sqlite3"),
+)
+
+
+def make_cache_key(*parts):
+    """Build a stable hash key from JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """A TTL + LRU bounded cache stored in one SQLite table."""
+
+    def __init__(self, table, path=None, ttl_seconds=86400, max_entries=1000):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.table = table
+        self.path = path or DEFAULT_CACHE_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._ensure_table()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # One connection per thread; WAL lets readers and a writer from
+            # other processes work on the same file concurrently.
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ensure_table(self):
+        self._connect().execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._connect().execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_idx ON {self.table} (accessed_at)"
+        )
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl_seconds and now - created_at > self.ttl_seconds:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return None
+        conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, value):
+        """Store a JSON-serialisable value and trim the table to max_entries."""
+        conn = self._connect()
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if self.ttl_seconds:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+            if self.max_entries:
+                conn.execute(
+                    f"""DELETE FROM {self.table} WHERE key IN (
+                        SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_entries,),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connect().execute(f"DELETE FROM {self.table}")
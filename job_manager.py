@@ -0,0 +1,193 @@
+"""
+Background job execution for blog generation.
+
+Jobs run on a process-wide worker pool, so Streamlit reruns never block on
+or repeat a generation. Identical submissions with the same API keys while a
+job is still queued or running return that job instead of starting a new one.
+Job snapshots are written to the shared SQLite cache, so status and results
+can be looked up after the in-memory entry has been pruned or from another
+process.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from disk_cache import DiskCache, make_cache_key
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+JOB_WORKERS = int(os.getenv("ALWRITY_JOB_WORKERS", "4"))
+JOB_RETENTION_SECONDS = int(os.getenv("ALWRITY_JOB_RETENTION_SECONDS", str(6 * 3600)))
+# Streaming jobs persist their partial text at most this often
+PERSIST_INTERVAL_SECONDS = 1.0
+
+job_store = DiskCache("jobs", ttl_seconds=JOB_RETENTION_SECONDS, max_entries=2000)
+
+
+class Job:
+    """One generation request and everything the UI needs to show its progress."""
+
+    def __init__(self, job_id, params, secrets, dedupe_key):
+        self.id = job_id
+        self.params = params
+        self.secrets = secrets
+        self.dedupe_key = dedupe_key
+        self.status = QUEUED
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.partial = ""
+        self.result = None
+        self.error = None
+        self.stats = {}
+        # Localized versions of the result, keyed by language
+        self.translations = {}
+        self.translation_errors = {}
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._persisted_at = 0.0
+
+    # --- updates from the worker thread ---
+
+    def set_stage(self, stage, progress=None):
+        with self._lock:
+            self.stage = stage
+            if progress is not None:
+                self.progress = progress
+        self.persist()
+
+    def append(self, text):
+        with self._lock:
+            self.partial += text
+        self.persist(throttle=True)
+
+    def reset_partial(self):
+        with self._lock:
+            self.partial = ""
+        self.persist(throttle=True)
+
+    def add_translation(self, language, text=None, error=None):
+        with self._lock:
+            if error is None:
+                self.translations[language] = text
+            else:
+                self.translation_errors[language] = error
+        self.persist()
+
+    def update_stats(self, **stats):
+        with self._lock:
+            self.stats.update(stats)
+
+    # --- snapshots ---
+
+    def to_dict(self):
+        """JSON-safe snapshot of the job; API keys are never included."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "params": dict(self.params),
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.progress,
+                "partial": self.partial,
+                "result": self.result,
+                "error": self.error,
+                "stats": dict(self.stats),
+                "translations": dict(self.translations),
+                "translation_errors": dict(self.translation_errors),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+    def persist(self, throttle=False):
+        now = time.monotonic()
+        if throttle and now - self._persisted_at < PERSIST_INTERVAL_SECONDS:
+            return
+        self._persisted_at = now
+        try:
+            job_store.set(self.id, self.to_dict())
+        except Exception as err:
+            logger.warning("Could not persist job %s: %s", self.id, err)
+
+
+class JobManager:
+    """Runs jobs on a bounded worker pool and keeps them addressable by id."""
+
+    def __init__(self, runner, max_workers=JOB_WORKERS):
+        self.runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alwrity-job")
+        self._jobs = {}
+        self._active_by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, params, secrets=None):
+        """Queue runner(job) for params; returns the existing job if an identical one is active.
+
+        The API keys are part of the identity (hashed, never stored), so a
+        caller is never handed a job that runs on someone else's quota.
+        """
+        dedupe_key = make_cache_key("job", params, secrets or {})
+        with self._lock:
+            self._prune()
+            active_id = self._active_by_key.get(dedupe_key)
+            if active_id and self._jobs[active_id].status in ACTIVE_STATES:
+                return self._jobs[active_id]
+            job = Job(uuid.uuid4().hex, dict(params), dict(secrets or {}), dedupe_key)
+            self._jobs[job.id] = job
+            self._active_by_key[dedupe_key] = job.id
+        job.persist()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        with job._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+        job.persist()
+        try:
+            result = self.runner(job)
+        except Exception as err:
+            logger.exception("Job %s failed", job.id)
+            with job._lock:
+                job.status = FAILED
+                job.error = str(err)
+        else:
+            with job._lock:
+                job.status = SUCCEEDED
+                job.result = result
+                job.progress = 1.0
+                job.stage = "Done"
+        finally:
+            with job._lock:
+                job.finished_at = time.time()
+                job.secrets = {}
+            with self._lock:
+                if self._active_by_key.get(job.dedupe_key) == job.id:
+                    del self._active_by_key[job.dedupe_key]
+            job.persist()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Return a job snapshot dict, from memory or the shared store; None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return job_store.get(job_id)
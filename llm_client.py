@@ -1,5 +1,23 @@
+import logging
+import os
+import threading
 import time
-from google import genai
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+from circuit_breaker import CircuitOpenError, get_breaker
+import context_cache
+from client_pool import get_gemini_client
+from model_router import get_router
+from prompts import estimate_tokens
+from rate_limiter import MAX_WAIT_SECONDS, RateLimitExceeded, backoff_delay, get_rate_limiter, retry_after_hint
+
+
+logger = logging.getLogger(__name__)
+
+# Yielded by stream_with_fallback when a model fails after emitting output;
+# callers should discard the partial text received so far.
+STREAM_RESET = object()
 
 
 FALLBACK_MODELS = [
@@ -8,6 +26,20 @@ FALLBACK_MODELS = [
     "gemini-2.5-pro",
 ]
 
+# Start a hedge request on the next model if the current one has not answered
+# within this many seconds. 0 disables hedging.
+HEDGE_AFTER_SECONDS = float(os.getenv("ALWRITY_HEDGE_AFTER_SECONDS", "45"))
+
+# Non-streaming Gemini calls run on this pool, so its size caps how many of
+# them the whole process has in flight. It must cover JOB_WORKERS jobs times
+# the parallel section and localization workers, plus hedges. Requests cannot
+# be cancelled once sent, so a losing hedge keeps its thread until the SDK
+# call returns.
+GEMINI_WORKERS = int(os.getenv("ALWRITY_GEMINI_WORKERS", "64"))
+_hedge_pool = ThreadPoolExecutor(max_workers=GEMINI_WORKERS, thread_name_prefix="gemini-hedge")
+# How often a request waiting on the pool checks whether its call has started
+_HEDGE_POLL_SECONDS = 0.05
+
 
 def _is_retryable_error(err):
     message = str(err).lower()
@@ -15,22 +47,298 @@ def _is_retryable_error(err):
     return any(token in message for token in retry_tokens)
 
 
-def generate_with_fallback(prompt, api_key, models=None, max_retries=2):
-    """Generate text using fallback models from fastest to slowest."""
-    client = genai.Client(api_key=api_key)
-    model_list = models or FALLBACK_MODELS
+def _is_rate_limit_error(err):
+    message = str(err).lower()
+    return any(token in message for token in ("429", "rate limit", "resource_exhausted", "quota"))
+
+
+def _retry_wait(api_key, model_name, err, attempt):
+    """Share any server retry hint with other sessions and return the backoff to sleep."""
+    if _is_rate_limit_error(err):
+        hint = retry_after_hint(err)
+        if hint:
+            get_rate_limiter().penalize(api_key, model_name, hint)
+    return backoff_delay(err, attempt)
+
+
+def _record_attempt(model_name, outcome, seconds, estimated_tokens, usage=None, error=None, streaming=False):
+    """Count one model attempt, feed it to the router and emit it as a structured event.
+
+    estimated_tokens is the local prompt size estimate used for routing; the
+    token counts reported by Gemini come from usage, when the call returned it.
+    """
+    get_router().record(model_name, seconds, outcome == "ok", estimated_tokens)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+    response_tokens = getattr(usage, "candidates_token_count", None) or 0
+    cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+    metrics.increment("gemini_attempts_total", model=model_name, outcome=outcome)
+    metrics.observe("gemini_attempt_seconds", seconds, model=model_name, outcome=outcome)
+    if prompt_tokens:
+        metrics.increment("gemini_prompt_tokens_total", prompt_tokens, model=model_name)
+    if response_tokens:
+        metrics.increment("gemini_response_tokens_total", response_tokens, model=model_name)
+    if cached_tokens:
+        metrics.increment("gemini_cached_tokens_total", cached_tokens, model=model_name)
+    metrics.emit_event(
+        "model_attempt",
+        model=model_name,
+        outcome=outcome,
+        seconds=round(seconds, 4),
+        streaming=streaming,
+        estimated_tokens=estimated_tokens,
+        prompt_tokens=prompt_tokens,
+        response_tokens=response_tokens,
+        cached_tokens=cached_tokens,
+        error=str(error) if error else None,
+    )
+
+
+def _record_request(model_name, seconds, errors, hedged=False, streaming=False, time_to_first_token=None):
+    """Record which model finally served a request, keeping the errors seen on the way."""
+    metrics.increment("gemini_requests_served_total", model=model_name, hedged=str(hedged).lower())
+    metrics.observe("gemini_request_seconds", seconds, model=model_name, streaming=str(streaming).lower())
+    if time_to_first_token is not None:
+        metrics.observe("gemini_time_to_first_token_seconds", time_to_first_token, model=model_name)
+    metrics.emit_event(
+        "generation",
+        model=model_name,
+        seconds=round(seconds, 4),
+        hedged=hedged,
+        streaming=streaming,
+        time_to_first_token=round(time_to_first_token, 4) if time_to_first_token is not None else None,
+        fallback_errors=list(errors),
+    )
+
+
+def _record_failure(errors, streaming=False):
+    metrics.increment("gemini_requests_failed_total")
+    metrics.emit_event("generation_failed", streaming=streaming, fallback_errors=list(errors))
+
+
+def _available_models(model_list):
+    """Drop models whose circuit is open; if every circuit is open, try them all."""
+    available = [model for model in model_list if get_breaker(model).available()]
+    return available or list(model_list)
+
+
+def _route(model_list, estimated_tokens):
+    """Available models ordered by expected completion time, plus the router's decision."""
+    return get_router().order(_available_models(model_list), estimated_tokens)
+
+
+def _generate_on_model(client, api_key, model_name, prompt, max_retries, errors, cancelled=None, started=None):
+    """Run the retry ladder for one model and return the response text.
+
+    The started event, if given, is set just before the first request is
+    sent. Once the cancelled event is set (a hedge on another model already
+    won), no further attempts or retry sleeps are started and None is returned.
+    """
+    breaker = get_breaker(model_name)
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(str(prompt))
+    for attempt in range(max_retries + 1):
+        if cancelled is not None and cancelled.is_set():
+            return None
+        try:
+            limiter.acquire(api_key, model_name)
+        except RateLimitExceeded as err:
+            errors.append(str(err))
+            raise
+        if not breaker.allow():
+            errors.append(f"{model_name}: circuit open")
+            raise CircuitOpenError(f"{model_name}: circuit open")
+        attempt_started = time.perf_counter()
+        settled = False
+        try:
+            request = context_cache.request_args(client, api_key, model_name, prompt)
+            if started is not None:
+                started.set()
+            response = client.models.generate_content(model=model_name, **request)
+            breaker.record_success()
+            settled = True
+        except Exception as err:
+            errors.append(f"{model_name}: {err}")
+            context_cache.invalidate_on_error(api_key, model_name, prompt, err)
+            retryable = _is_retryable_error(err)
+            if retryable:
+                breaker.record_failure()
+                settled = True
+            _record_attempt(model_name, "error", time.perf_counter() - attempt_started, estimated_tokens, error=err)
+            if attempt < max_retries and retryable:
+                delay = _retry_wait(api_key, model_name, err, attempt)
+                if delay <= MAX_WAIT_SECONDS:
+                    if cancelled is not None:
+                        if cancelled.wait(delay):
+                            return None
+                    else:
+                        time.sleep(delay)
+                    continue
+            raise
+        finally:
+            if not settled:
+                # Free a half-open probe slot the outcome above did not settle
+                breaker.release()
+        _record_attempt(model_name, "ok", time.perf_counter() - attempt_started, estimated_tokens,
+                        getattr(response, "usage_metadata", None))
+        return response.text
+    raise RuntimeError(f"{model_name}: retries exhausted")
+
+
+def generate_with_fallback(prompt, api_key, models=None, max_retries=2, hedge_after=None):
+    """Generate text using fallback models, fastest expected first.
+
+    The model order comes from the latency-aware router (see model_router);
+    models with an open circuit breaker are skipped. If the running model has
+    not answered within hedge_after seconds (default HEDGE_AFTER_SECONDS) of
+    its request being sent, the next model is started in parallel and
+    whichever answers first wins. Time spent waiting for a pool thread does
+    not count, so a busy pool is not made busier by hedges.
+    """
+    client = get_gemini_client(api_key)
+    model_list, _ = _route(models or FALLBACK_MODELS, estimate_tokens(str(prompt)))
+    hedge_after = HEDGE_AFTER_SECONDS if hedge_after is None else hedge_after
+    errors = []
+    pending = {}
+    next_index = 0
+    hedged = False
+    # Set once a model answers, so losing hedges stop retrying
+    cancelled = threading.Event()
+    started = time.perf_counter()
+    # Set by the newest attempt when its request is sent; the hedge timer starts then
+    call_started = None
+    call_started_at = None
+
+    def launch_next():
+        nonlocal next_index, call_started, call_started_at
+        model_name = model_list[next_index]
+        next_index += 1
+        call_started = threading.Event()
+        call_started_at = None
+        future = _hedge_pool.submit(_generate_on_model, client, api_key, model_name, prompt, max_retries, errors,
+                                    cancelled, call_started)
+        pending[future] = model_name
+
+    launch_next()
+    while pending:
+        timeout = None
+        if hedge_after > 0 and next_index < len(model_list):
+            if call_started_at is None and call_started.is_set():
+                call_started_at = time.perf_counter()
+            if call_started_at is None:
+                # Still queued for a pool thread: do not hedge yet
+                timeout = _HEDGE_POLL_SECONDS
+            else:
+                timeout = max(0.0, hedge_after - (time.perf_counter() - call_started_at))
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            if call_started_at is None or time.perf_counter() - call_started_at < hedge_after:
+                continue
+            logger.info("hedging: %s slower than %.1fs, starting %s",
+                        ", ".join(pending.values()), hedge_after, model_list[next_index])
+            metrics.increment("gemini_hedges_started_total", model=model_list[next_index])
+            hedged = True
+            launch_next()
+            continue
+        for future in done:
+            model_name = pending.pop(future)
+            try:
+                text = future.result()
+            except Exception:
+                continue
+            cancelled.set()
+            _record_request(model_name, time.perf_counter() - started, errors, hedged=hedged)
+            return text
+        if not pending and next_index < len(model_list):
+            launch_next()
+
+    _record_failure(errors)
+    raise RuntimeError("All Gemini fallback models failed. " + " | ".join(errors))
+
+
+def stream_with_fallback(prompt, api_key, models=None, max_retries=2, stats=None):
+    """Stream text chunks using fallback models, fastest expected first.
+
+    If a model fails after it has started producing output, STREAM_RESET is
+    yielded before the next attempt restarts the article from scratch.
+    When a stats dict is given it is filled with the serving model,
+    time_to_first_token, total_seconds and the router's decision.
+    """
+    client = get_gemini_client(api_key)
+    estimated_tokens = estimate_tokens(str(prompt))
+    model_list, decision = _route(models or FALLBACK_MODELS, estimated_tokens)
     errors = []
+    started = time.perf_counter()
+    if stats is None:
+        stats = {}
 
+    limiter = get_rate_limiter()
     for model_name in model_list:
+        breaker = get_breaker(model_name)
         for attempt in range(max_retries + 1):
             try:
-                response = client.models.generate_content(model=model_name, contents=prompt)
-                return response.text
+                limiter.acquire(api_key, model_name)
+            except RateLimitExceeded as err:
+                errors.append(str(err))
+                break
+            if not breaker.allow():
+                errors.append(f"{model_name}: circuit open")
+                break
+            emitted = False
+            first_token_at = None
+            usage = None
+            attempt_started = time.perf_counter()
+            settled = False
+            try:
+                request = context_cache.request_args(client, api_key, model_name, prompt)
+                for chunk in client.models.generate_content_stream(model=model_name, **request):
+                    # Usage totals arrive on the final chunk
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    text = chunk.text
+                    if not text:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    emitted = True
+                    yield text
+                breaker.record_success()
+                settled = True
+                _record_attempt(model_name, "ok", time.perf_counter() - attempt_started, estimated_tokens, usage, streaming=True)
+                total = time.perf_counter() - started
+                stats.update(
+                    model=model_name,
+                    time_to_first_token=(first_token_at or time.perf_counter()) - started,
+                    total_seconds=total,
+                    errors=errors,
+                    route=decision,
+                )
+                _record_request(model_name, total, errors, streaming=True,
+                                time_to_first_token=stats["time_to_first_token"])
+                logger.info(
+                    "stream completed model=%s ttft=%.2fs total=%.2fs errors=%d",
+                    model_name, stats["time_to_first_token"], total, len(errors),
+                )
+                return
             except Exception as err:
                 errors.append(f"{model_name}: {err}")
-                if attempt < max_retries and _is_retryable_error(err):
-                    time.sleep(1 + attempt)
-                    continue
+                context_cache.invalidate_on_error(api_key, model_name, prompt, err)
+                retryable = _is_retryable_error(err)
+                if retryable:
+                    breaker.record_failure()
+                    settled = True
+                _record_attempt(model_name, "error", time.perf_counter() - attempt_started, estimated_tokens, usage,
+                                error=err, streaming=True)
+                if emitted:
+                    yield STREAM_RESET
+                if attempt < max_retries and retryable:
+                    delay = _retry_wait(api_key, model_name, err, attempt)
+                    if delay <= MAX_WAIT_SECONDS:
+                        time.sleep(delay)
+                        continue
                 break
+            finally:
+                if not settled:
+                    # Non-transient error or the consumer stopped reading: free a half-open probe slot
+                    breaker.release()
 
+    _record_failure(errors, streaming=True)
     raise RuntimeError("All Gemini fallback models failed. " + " | ".join(errors))
@@ -0,0 +1,60 @@
+"""
+Multi-language fan-out for finished blog posts.
+
+The post is researched and written once in the primary language; every other
+language is produced concurrently by a localization call on that finished
+post, which is shorter and cheaper than a full rewrite and also localizes the
+SEO metadata block.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+from result_cache import generate_cached
+from prompts import render_localization_prompt
+
+
+logger = logging.getLogger(__name__)
+
+LOCALIZATION_MAX_WORKERS = int(os.getenv("ALWRITY_LOCALIZATION_MAX_WORKERS", "4"))
+
+
+def localize_blog_post(blog_post, input_blog_keywords, source_language, target_language, gemini_api_key,
+                       gemini_slots=None):
+    """Localize one finished post into target_language and return the markdown."""
+    prompt = render_localization_prompt(source_language, target_language, input_blog_keywords, blog_post)
+    with metrics.timed_stage("localize", language=target_language):
+        return generate_cached(prompt, gemini_api_key, gemini_slots=gemini_slots).strip()
+
+
+def localize_blog_posts(blog_post, input_blog_keywords, source_language, target_languages, gemini_api_key,
+                        max_workers=LOCALIZATION_MAX_WORKERS, on_result=None, gemini_slots=None):
+    """Localize a post into several languages at once.
+
+    Returns (posts, errors), both dicts keyed by language. One language failing
+    does not affect the others. on_result(language, post, error) is called from
+    the calling thread as each language finishes. gemini_slots, when given, is
+    a semaphore held around each Gemini call.
+    """
+    languages = [language for language in dict.fromkeys(target_languages) if language != source_language]
+    posts, errors = {}, {}
+    if not languages:
+        return posts, errors
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="localize") as executor:
+        futures = {
+            executor.submit(localize_blog_post, blog_post, input_blog_keywords, source_language, language, gemini_api_key,
+                            gemini_slots): language
+            for language in languages
+        }
+        for future in as_completed(futures):
+            language = futures[future]
+            try:
+                posts[language] = future.result()
+            except Exception as err:
+                logger.warning("Localization into %s failed: %s", language, err)
+                errors[language] = str(err)
+            if on_result:
+                on_result(language, posts.get(language), errors.get(language))
+    return posts, errors
@@ -0,0 +1,83 @@
+"""
+Outline-then-parallel-sections generation for Long Detailed posts.
+
+One call plans the outline; the introduction, every section, the conclusion,
+the FAQs and the SEO metadata are then written concurrently from focused
+prompts that share the same compacted research context, and stitched together
+in outline order.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+from result_cache import generate_cached
+from prompts import (
+    compact_serp_results,
+    get_outline_prompt,
+    get_section_prompt,
+    get_faq_prompt,
+    get_metadata_prompt,
+    parse_outline,
+)
+
+
+logger = logging.getLogger(__name__)
+
+LONG_FORM_MAX_WORKERS = int(os.getenv("ALWRITY_LONG_FORM_MAX_WORKERS", "8"))
+
+
+def build_references(serp_results):
+    """Format the References section straight from the search results."""
+    lines = ["## References"]
+    for index, result in enumerate(serp_results or [], start=1):
+        title = result.get('title') or result.get('url')
+        lines.append(f"{index}. [{title}]({result.get('url')})")
+    return "\n".join(lines)
+
+
+def generate_long_blog_parallel(input_blog_keywords, input_type, input_tone, input_language, serp_results,
+                                gemini_api_key, max_workers=LONG_FORM_MAX_WORKERS, on_progress=None, gemini_slots=None):
+    """Generate a Long Detailed post from an outline with sections written in parallel.
+
+    on_progress(done, total) is called from the calling thread as parts finish.
+    gemini_slots, when given, is a semaphore held around each Gemini call.
+    Raises ValueError if the outline cannot be parsed, so callers can fall back
+    to the single-prompt long form.
+    """
+    serp_context, _ = compact_serp_results(serp_results, input_blog_keywords, 'Long Detailed (2000+ words)')
+    shared = (input_type, input_tone, input_language, input_blog_keywords, serp_context)
+
+    with metrics.timed_stage("outline"):
+        # Only outlines that parse are cached; a rejected one is regenerated on the next try
+        outline = parse_outline(generate_cached(get_outline_prompt(*shared), gemini_api_key, validate=parse_outline,
+                                                gemini_slots=gemini_slots))
+    logger.info("Outline ready with %d sections", len(outline['sections']))
+
+    parts = [('introduction', get_section_prompt(*shared, outline, 'introduction', outline['introduction']))]
+    for section in outline['sections']:
+        parts.append(('section', get_section_prompt(*shared, outline, 'section', section['key_points'], section['heading'])))
+    parts.append(('conclusion', get_section_prompt(*shared, outline, 'conclusion', outline['conclusion'])))
+    parts.append(('faqs', get_faq_prompt(*shared, outline)))
+    parts.append(('metadata', get_metadata_prompt(*shared, outline)))
+
+    results = [None] * len(parts)
+    total = len(parts) + 1
+    if on_progress:
+        on_progress(1, total)
+    with metrics.timed_stage("sections", parts=len(parts)), \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="long-form") as executor:
+        futures = {
+            executor.submit(generate_cached, prompt, gemini_api_key, gemini_slots=gemini_slots): index
+            for index, (_, prompt) in enumerate(parts)
+        }
+        for done, future in enumerate(as_completed(futures), start=2):
+            results[futures[future]] = future.result().strip()
+            if on_progress:
+                on_progress(done, total)
+
+    blocks = [f"# {outline['title']}"] if outline['title'] else []
+    blocks.extend(results[:-1])
+    blocks.append(build_references(serp_results))
+    blocks.append(results[-1])
+    return "\n\n".join(blocks)
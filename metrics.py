@@ -0,0 +1,179 @@
+"""
+In-process metrics registry shared by the pipeline modules.
+
+Counters, gauges and histograms are keyed by metric name plus a sorted tuple
+of labels and can be rendered in the Prometheus text format. Individual events
+(stage timings, model attempts) are also written as JSON lines to the file
+named by ALWRITY_METRICS_LOG, when set.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+logger = logging.getLogger(__name__)
+
+# Generation latencies range from sub-second cache hits to multi-minute long posts
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_event_lock = threading.Lock()
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def increment(name, value=1, **labels):
+    """Add value to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """Set a gauge to its current value."""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram."""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": [0] * len(DEFAULT_BUCKETS), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                histogram["buckets"][index] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+def emit_event(event, **fields):
+    """Append one structured event to the JSON lines log, if configured."""
+    path = os.getenv("ALWRITY_METRICS_LOG")
+    if not path:
+        return
+    record = {"ts": round(time.time(), 3), "event": event}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    try:
+        with _event_lock, open(path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+    except OSError as err:
+        logger.warning("Could not write metrics event to %s: %s", path, err)
+
+
+@contextmanager
+def timed_stage(stage, **fields):
+    """Time a pipeline stage, recording a histogram sample and a stage event.
+
+    The yielded dict can be filled with extra fields for the event.
+    """
+    extra = dict(fields)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield extra
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        observe("alwrity_stage_seconds", seconds, stage=stage, status=status)
+        emit_event("stage", stage=stage, status=status, seconds=round(seconds, 4), **extra)
+
+
+def record_cache(cache, hit):
+    increment("alwrity_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+    emit_event("cache", cache=cache, hit=hit)
+
+
+def snapshot():
+    """Return a copy of all counters, gauges and histograms."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {key: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}
+                           for key, h in _histograms.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_prometheus():
+    """Render the registry in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+    typed = set()
+
+    def type_line(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in sorted(data["counters"].items()):
+        type_line(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), value in sorted(data["gauges"].items()):
+        type_line(name, "gauge")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), histogram in sorted(data["histograms"].items()):
+        type_line(name, "histogram")
+        for bound, count in zip(DEFAULT_BUCKETS, histogram["buckets"]):
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics endpoint: " + format, *args)
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve /metrics on a background thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, port)
+    return server
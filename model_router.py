@@ -0,0 +1,158 @@
+"""
+Latency-aware ordering of Gemini fallback models.
+
+Every model attempt is recorded with its duration, outcome and the estimated
+prompt size. For each request the router estimates, per model and prompt size
+class, the expected time of a successful call, the success rate and the time
+lost on a failed call. It then orders the models to minimise expected
+completion time: trying models in increasing order of
+expected-time-per-attempt / success-rate is optimal for sequential fallback.
+
+Estimates blend recent observations with a prior derived from the static
+order, so with no history the static FALLBACK_MODELS order is kept, and a
+model needs several recent samples before it can overtake another.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import metrics
+
+
+ROUTER_ENABLED = os.getenv("ALWRITY_ROUTER", "1") != "0"
+# Only attempts from this recent window count
+ROUTER_WINDOW_SECONDS = float(os.getenv("ALWRITY_ROUTER_WINDOW_SECONDS", "900"))
+ROUTER_MAX_SAMPLES = 200
+# How many observations the prior is worth
+ROUTER_PRIOR_WEIGHT = float(os.getenv("ALWRITY_ROUTER_PRIOR_WEIGHT", "3"))
+# Prior latency for the n-th static model is (n + 1) * this, scaled by prompt size
+ROUTER_PRIOR_SECONDS = 10.0
+ROUTER_PRIOR_SUCCESS_RATE = 0.95
+
+# Estimated prompt tokens -> size class; latency is compared within a class
+SIZE_CLASSES = (
+    ("small", 2000, 1.0),
+    ("medium", 8000, 1.5),
+    ("large", float("inf"), 2.5),
+)
+
+
+def size_class(prompt_tokens):
+    """Return (name, prior latency multiplier) for an estimated prompt size."""
+    for name, upper, multiplier in SIZE_CLASSES:
+        if prompt_tokens <= upper:
+            return name, multiplier
+    return SIZE_CLASSES[-1][0], SIZE_CLASSES[-1][2]
+
+
+class ModelRouter:
+    """Rolling per-model latency and success windows used to order fallback models."""
+
+    def __init__(self, window_seconds=ROUTER_WINDOW_SECONDS, prior_weight=ROUTER_PRIOR_WEIGHT,
+                 enabled=ROUTER_ENABLED):
+        self.window_seconds = window_seconds
+        self.prior_weight = prior_weight
+        self.enabled = enabled
+        self._samples = {}
+        self._decisions = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def record(self, model_name, seconds, ok, prompt_tokens):
+        """Record one attempt on model_name for a prompt of prompt_tokens estimated tokens."""
+        key = (model_name, size_class(prompt_tokens)[0])
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=ROUTER_MAX_SAMPLES)
+            samples.append((time.monotonic(), seconds, ok))
+
+    def _recent(self, key, now):
+        samples = self._samples.get(key, ())
+        while samples and now - samples[0][0] > self.window_seconds:
+            samples.popleft()
+        return list(samples)
+
+    def estimate(self, model_name, rank, prompt_tokens, now=None):
+        """Expected success latency, success rate, failure cost and ordering score for one model."""
+        name, multiplier = size_class(prompt_tokens)
+        prior_latency = (rank + 1) * ROUTER_PRIOR_SECONDS * multiplier
+        with self._lock:
+            samples = self._recent((model_name, name), now or time.monotonic())
+        successes = [seconds for _, seconds, ok in samples if ok]
+        failures = [seconds for _, seconds, ok in samples if not ok]
+        weight = self.prior_weight
+
+        latency = (prior_latency * weight + sum(successes)) / (weight + len(successes))
+        failure_seconds = (prior_latency / 2 * weight + sum(failures)) / (weight + len(failures))
+        success_rate = (ROUTER_PRIOR_SUCCESS_RATE * weight + len(successes)) / (weight + len(samples))
+        attempt_seconds = success_rate * latency + (1 - success_rate) * failure_seconds
+        return {
+            "model": model_name,
+            "size_class": name,
+            "samples": len(samples),
+            "latency": round(latency, 3),
+            "success_rate": round(success_rate, 3),
+            "failure_seconds": round(failure_seconds, 3),
+            "score": round(attempt_seconds / max(success_rate, 1e-6), 3),
+        }
+
+    def order(self, model_list, prompt_tokens):
+        """Return model_list reordered by expected completion time and record the decision."""
+        model_list = list(model_list)
+        now = time.monotonic()
+        estimates = [self.estimate(model, rank, prompt_tokens, now) for rank, model in enumerate(model_list)]
+        if self.enabled:
+            ordered = [estimate["model"] for estimate in sorted(estimates, key=lambda estimate: estimate["score"])]
+        else:
+            ordered = model_list
+        decision = {
+            "at": time.time(),
+            "prompt_tokens": prompt_tokens,
+            "static_order": model_list,
+            "order": ordered,
+            "reordered": ordered != model_list,
+            "estimates": estimates,
+        }
+        with self._lock:
+            self._decisions.append(decision)
+        if decision["reordered"]:
+            metrics.increment("gemini_router_reorders_total", first=ordered[0])
+        metrics.emit_event("route", order=ordered, prompt_tokens=prompt_tokens, reordered=decision["reordered"])
+        return ordered, decision
+
+    @property
+    def last_decision(self):
+        with self._lock:
+            return self._decisions[-1] if self._decisions else None
+
+    def recent_decisions(self):
+        with self._lock:
+            return list(self._decisions)
+
+    def snapshot(self):
+        """Current sample counts, success rates and mean success latency per model and size class."""
+        now = time.monotonic()
+        summary = {}
+        with self._lock:
+            for (model_name, name) in list(self._samples):
+                samples = self._recent((model_name, name), now)
+                successes = [seconds for _, seconds, ok in samples if ok]
+                summary.setdefault(model_name, {})[name] = {
+                    "samples": len(samples),
+                    "success_rate": round(len(successes) / len(samples), 3) if samples else None,
+                    "mean_latency": round(sum(successes) / len(successes), 3) if successes else None,
+                }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._decisions.clear()
+
+
+_router = ModelRouter()
+
+
+def get_router():
+    return _router
@@ -2,9 +2,39 @@
 Prompts package for Alwrity Blog Writer
 Exports prompt loading and formatting functions
 """
-from .prompt_loader import load_prompt
-from .short_blog_prompt import get_short_blog_prompt
-from .long_blog_prompt import get_long_blog_prompt
+from .prompt_loader import load_prompt, is_long_form
+from .short_blog_prompt import get_short_blog_prompt, render_short_blog_prompt
+from .long_blog_prompt import get_long_blog_prompt, render_long_blog_prompt
+from .template_registry import PromptTemplate, StructuredPrompt, register_template, get_template
+from .serp_context import compact_serp_results, estimate_tokens
+from .long_blog_sections_prompt import (
+    get_outline_prompt,
+    get_section_prompt,
+    get_faq_prompt,
+    get_metadata_prompt,
+    parse_outline,
+)
+from .localization_prompt import get_localization_prompt, render_localization_prompt
 
-__all__ = ['load_prompt', 'get_short_blog_prompt', 'get_long_blog_prompt']
+__all__ = [
+    'load_prompt',
+    'is_long_form',
+    'get_short_blog_prompt',
+    'get_long_blog_prompt',
+    'render_short_blog_prompt',
+    'render_long_blog_prompt',
+    'PromptTemplate',
+    'StructuredPrompt',
+    'register_template',
+    'get_template',
+    'compact_serp_results',
+    'estimate_tokens',
+    'get_outline_prompt',
+    'get_section_prompt',
+    'get_faq_prompt',
+    'get_metadata_prompt',
+    'parse_outline',
+    'get_localization_prompt',
+    'render_localization_prompt',
+]
 
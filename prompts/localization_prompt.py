@@ -0,0 +1,77 @@
+"""
+Localization Prompt Template
+Adapts a finished blog post into another language, including its SEO metadata,
+so extra languages reuse one research pass and one full generation
+"""
+from .template_registry import register_template
+
+
+LOCALIZATION_TEMPLATE = register_template(
+    'localize_blog',
+    prefix="""
+        You are ALwrity, an experienced SEO strategist and native-level localization editor. You adapt finished blog posts for readers in another language and market, so they read as if they were written there first.
+
+        ### Task:
+        Localize the source blog post below from the source language into the target language given in the Localization Details.
+
+        ### Requirements:
+        1. **Content**:
+           - Translate the full post; do not summarize, shorten or add new sections.
+           - Adapt idioms, examples, units, currencies and dates to what readers in the target language expect.
+           - Keep the tone, active voice and simple human language of the original.
+           - Avoid literal word-for-word phrasing and AI sounding words.
+
+        2. **Structure**:
+           - Keep the markdown structure exactly: the same heading levels, lists, tables, bold text and visual suggestions.
+           - Keep every URL and link target unchanged. In the References section, keep the article titles as they are.
+
+        3. **SEO Metadata** (localize, do not just translate):
+           - **Blog Title**: catchy, using the primary keyword phrase native speakers actually search for.
+           - **Meta Description**: rewritten in the target language, under 160 characters.
+           - **URL Slug**: short, lowercase, hyphenated, built from the localized keywords; transliterate non-Latin scripts to plain ASCII.
+           - **Hashtags**: replace with hashtags used in the target language.
+           - **Primary Keywords** and **Secondary Keywords**, if present: choose the terms native speakers use for the same search intent.
+
+        Return only the localized blog post in markdown, with no notes about the translation.
+        """,
+    suffix="""
+        ### Localization Details:
+        - **Source Language**: {source_language}
+        - **Target Language**: {target_language} (write the entire post in this language)
+        - **Topic / Keywords**: {input_blog_keywords}
+
+        ### Source Blog Post:
+        {blog_post}
+        """,
+)
+
+
+def render_localization_prompt(source_language, target_language, input_blog_keywords, blog_post):
+    """
+    Render the localization template as a structured prompt.
+
+    Returns:
+        StructuredPrompt: Static instruction prefix plus per-request suffix
+    """
+    return LOCALIZATION_TEMPLATE.render(
+        source_language=source_language,
+        target_language=target_language,
+        input_blog_keywords=input_blog_keywords,
+        blog_post=blog_post,
+    )
+
+
+def get_localization_prompt(source_language, target_language, input_blog_keywords, blog_post):
+    """
+    Generate the prompt that localizes a finished blog post into another language.
+
+    Args:
+        source_language (str): Language the blog post was written in
+        target_language (str): Language to localize into
+        input_blog_keywords (str): Main keywords/topic
+        blog_post (str): Finished blog post in markdown
+
+    Returns:
+        str: Formatted prompt string ready for LLM
+    """
+    return render_localization_prompt(source_language, target_language, input_blog_keywords, blog_post).text
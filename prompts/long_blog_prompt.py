@@ -3,30 +3,19 @@ Long Detailed Blog Prompt Template
 Enhanced version for comprehensive, in-depth blog posts (2000+ words)
 Based on the current prompt but optimized for longer, more detailed content
 """
+from .template_registry import register_template
 
 
-def get_long_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results):
-    """
-    Generate the long detailed blog prompt for comprehensive, in-depth blog posts.
-    
-    Args:
-        input_type (str): Blog post type (General, How-to Guides, etc.)
-        input_tone (str): Blog tone (Professional, Casual, etc.)
-        input_language (str): Language selection
-        input_blog_keywords (str): Main keywords/topic
-        serp_results: Search results from Exa/Metaphor
-    
-    Returns:
-        str: Formatted prompt string ready for LLM
-    """
-    prompt = f"""
-        You are ALwrity, an experienced SEO strategist and creative content writer who specializes in crafting comprehensive, in-depth {input_type} blog posts in {input_language}. Your blog posts are designed to rank highly in search results while providing extensive value and deeply engaging readers with a professional yet personable tone.
+LONG_BLOG_TEMPLATE = register_template(
+    'long_blog',
+    prefix="""
+        You are ALwrity, an experienced SEO strategist and creative content writer who specializes in crafting comprehensive, in-depth blog posts of the type and in the language given in the Blog Details below. Your blog posts are designed to rank highly in search results while providing extensive value and deeply engaging readers with a professional yet personable tone.
 
         ### Task:
-        Write a comprehensive, detailed, and SEO-optimized blog post of 2000+ words on the topic below. The blog should:
+        Write a comprehensive, detailed, and SEO-optimized blog post of 2000+ words on the topic given in the Blog Details below. The blog should:
         - Be extensively structured with 6-8 main sections, each with detailed subheadings and thorough explanations.
         - Include in-depth analysis, multiple real-world examples, case studies, and personal anecdotes to make the content highly valuable and practical.
-        - Be written in a {input_tone} tone that balances professionalism with a conversational style.
+        - Be written in the tone given in the Blog Details, balancing professionalism with a conversational style.
         - Provide comprehensive coverage of the topic with substantial depth and detail.
 
         ### Requirements:
@@ -94,14 +83,50 @@ def get_long_blog_prompt(input_type, input_tone, input_language, input_blog_keyw
              - A list of **Hashtags** (8-12 hashtags) relevant to the content.
              - **Primary Keywords**: List 3-5 primary keywords.
              - **Secondary Keywords**: List 5-7 secondary/LSI keywords.
-
+        """,
+    suffix="""
         ### Blog Details:
+        - **Blog Post Type**: {input_type}
+        - **Language**: {input_language} (write the entire blog post in this language)
+        - **Tone**: {input_tone}
         - **Title**: {input_blog_keywords}
         - **Keywords**: {input_blog_keywords}
         - **Google SERP Results**: {serp_results}
         - **Target Word Count**: 2000+ words (comprehensive and detailed)
 
-        Now, craft an exceptional, comprehensive blog post that stands out in search results, provides extensive value to readers, and demonstrates deep expertise on the topic. Ensure the content is thorough, well-researched, and covers all aspects of the topic in detail.
-        """
-    return prompt
+        Now, craft an exceptional, comprehensive {input_type} blog post in {input_language} that stands out in search results, provides extensive value to readers, and demonstrates deep expertise on the topic. Ensure the content is thorough, well-researched, and covers all aspects of the topic in detail.
+        """,
+)
+
+
+def render_long_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results):
+    """
+    Render the long detailed template as a structured prompt.
+
+    Returns:
+        StructuredPrompt: Static instruction prefix plus per-request suffix
+    """
+    return LONG_BLOG_TEMPLATE.render(
+        input_type=input_type,
+        input_tone=input_tone,
+        input_language=input_language,
+        input_blog_keywords=input_blog_keywords,
+        serp_results=serp_results,
+    )
 
+
+def get_long_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results):
+    """
+    Generate the long detailed blog prompt for comprehensive, in-depth blog posts.
+    
+    Args:
+        input_type (str): Blog post type (General, How-to Guides, etc.)
+        input_tone (str): Blog tone (Professional, Casual, etc.)
+        input_language (str): Language selection
+        input_blog_keywords (str): Main keywords/topic
+        serp_results: Search results from Exa/Metaphor
+    
+    Returns:
+        str: Formatted prompt string ready for LLM
+    """
+    return render_long_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results).text
@@ -0,0 +1,188 @@
+"""
+Sectioned Long Detailed Blog Prompt Templates
+Splits the long blog prompt into an outline call followed by focused prompts
+for each section, the FAQs and the SEO metadata, so they can run in parallel
+"""
+import json
+import re
+
+
+def _shared_context(input_type, input_tone, input_language, input_blog_keywords, serp_context):
+    return f"""
+        You are ALwrity, an experienced SEO strategist and creative content writer who specializes in crafting comprehensive, in-depth {input_type} blog posts in {input_language}. You write in a {input_tone} tone that balances professionalism with a conversational style.
+
+        ### Blog Details:
+        - **Topic / Keywords**: {input_blog_keywords}
+        - **Language**: {input_language}
+        - **Google SERP Research**:
+{serp_context}
+        """
+
+
+def get_outline_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_context):
+    """
+    Generate the prompt that asks for a structured outline of a long blog post.
+
+    Args:
+        input_type (str): Blog post type (General, How-to Guides, etc.)
+        input_tone (str): Blog tone (Professional, Casual, etc.)
+        input_language (str): Language selection
+        input_blog_keywords (str): Main keywords/topic
+        serp_context (str): Compacted search results
+
+    Returns:
+        str: Prompt asking for a JSON outline
+    """
+    return _shared_context(input_type, input_tone, input_language, input_blog_keywords, serp_context) + f"""
+        ### Task:
+        Plan a comprehensive, SEO-optimized blog post of 2000+ words on the topic above. Do not write the post yet.
+        Return ONLY a JSON object (no markdown fences, no commentary) with this shape:
+        {{
+          "title": "Catchy blog title that includes the primary keyword",
+          "introduction": ["key point the introduction must cover", "..."],
+          "sections": [
+            {{"heading": "Section heading", "key_points": ["point", "point", "point"]}}
+          ],
+          "conclusion": ["key takeaway", "..."]
+        }}
+
+        ### Requirements:
+        - Plan 6-8 sections that follow this flow: overview and background, core concepts, step-by-step guide, real-world examples and case studies, best practices and expert insights, common mistakes to avoid, advanced tips and strategies.
+        - Give each section 3-5 specific key points drawn from the research above.
+        - Headings must be written in {input_language} and use the keywords naturally.
+        """
+
+
+def get_section_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_context,
+                       outline, part, key_points, heading=None):
+    """
+    Generate the prompt for one part of the long blog post.
+
+    Args:
+        input_type (str): Blog post type (General, How-to Guides, etc.)
+        input_tone (str): Blog tone (Professional, Casual, etc.)
+        input_language (str): Language selection
+        input_blog_keywords (str): Main keywords/topic
+        serp_context (str): Compacted search results
+        outline (dict): Parsed outline from the outline call
+        part (str): 'introduction', 'section' or 'conclusion'
+        key_points (list[str]): Points this part must cover
+        heading (str): Section heading, required when part is 'section'
+
+    Returns:
+        str: Prompt for a single markdown block
+    """
+    headings = "\n".join(f"          {i}. {section['heading']}" for i, section in enumerate(outline['sections'], start=1))
+    points = "\n".join(f"          - {point}" for point in key_points)
+
+    if part == 'introduction':
+        task = ("Write only the **Introduction (200-300 words)**: start with a compelling hook, clearly state the problem or topic, "
+                "outline the value proposition, and explain what readers will learn. Do not add a heading.")
+    elif part == 'conclusion':
+        task = ("Write only the **Conclusion (150-250 words)** under the heading '## Conclusion': summarize the key takeaways "
+                "and end with a clear call-to-action (CTA).")
+    else:
+        task = (f"Write only the section '## {heading}' (250-350 words). Use the heading exactly as given, add '###' subheadings, "
+                "bullet points or numbered lists where they help, include concrete examples or data from the research, and end with one "
+                "*[Visual suggestion: ...]* line describing an image, chart or video that would enhance this section.")
+
+    return _shared_context(input_type, input_tone, input_language, input_blog_keywords, serp_context) + f"""
+        ### Blog Outline:
+        - **Title**: {outline['title']}
+        - **Sections**:
+{headings}
+
+        ### Task:
+        You are writing one part of this blog post; other writers are handling the remaining parts in parallel.
+        {task}
+
+        Cover these points:
+{points}
+
+        ### Requirements:
+        - Write in {input_language}, in active voice, with simple human language.
+        - Use the keywords and related semantic terms naturally.
+        - Do not repeat content that belongs to other sections of the outline.
+        - Avoid fluff, unexplained jargon and AI sounding words like realm, evolving, etc.
+        - Return only the markdown for this part.
+        """
+
+
+def get_faq_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_context, outline):
+    """
+    Generate the prompt for the FAQs section of the long blog post.
+
+    Returns:
+        str: Prompt for the FAQs markdown block
+    """
+    return _shared_context(input_type, input_tone, input_language, input_blog_keywords, serp_context) + f"""
+        ### Blog Title: {outline['title']}
+
+        ### Task:
+        Write only the FAQs section under the heading '## Frequently Asked Questions'.
+        - Include 5-7 FAQs derived from "People also ask" queries and related search suggestions.
+        - Provide detailed, comprehensive answers to each question (100-150 words per FAQ).
+        - Ensure FAQs cover different aspects and angles of the topic.
+        - Write in {input_language}. Return only the markdown for this section.
+        """
+
+
+def get_metadata_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_context, outline):
+    """
+    Generate the prompt for the SEO metadata block of the long blog post.
+
+    Returns:
+        str: Prompt for the SEO metadata markdown block
+    """
+    headings = ", ".join(section['heading'] for section in outline['sections'])
+    return _shared_context(input_type, input_tone, input_language, input_blog_keywords, serp_context) + f"""
+        ### Blog Outline:
+        - **Title**: {outline['title']}
+        - **Sections**: {headings}
+
+        ### Task:
+        Write only the SEO metadata for this blog post under the heading '## SEO Metadata':
+        - A **Blog Title** that is catchy, includes the primary keyword, and is optimized for search.
+        - A **Meta Description** summarizing the blog post in under 160 characters, including primary keyword.
+        - A **URL Slug** that is descriptive, keyword-rich, and formatted in lowercase with hyphens.
+        - A list of **Hashtags** (8-12 hashtags) relevant to the content.
+        - **Primary Keywords**: List 3-5 primary keywords.
+        - **Secondary Keywords**: List 5-7 secondary/LSI keywords.
+        Write in {input_language}. Return only the markdown for this block.
+        """
+
+
+def parse_outline(text):
+    """
+    Parse the outline model response into a dict.
+
+    Args:
+        text (str): Raw model response, optionally wrapped in markdown fences
+
+    Returns:
+        dict: Outline with title, introduction, sections and conclusion
+
+    Raises:
+        ValueError: If the response does not contain a usable outline
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        raise ValueError("Outline response did not contain a JSON object")
+    try:
+        outline = json.loads(match.group(0))
+    except json.JSONDecodeError as err:
+        raise ValueError(f"Outline response is not valid JSON: {err}") from err
+
+    sections = [
+        {'heading': str(section.get('heading', '')).strip(), 'key_points': list(section.get('key_points') or [])}
+        for section in outline.get('sections') or []
+        if isinstance(section, dict) and section.get('heading')
+    ]
+    if not sections:
+        raise ValueError("Outline response has no sections")
+    return {
+        'title': str(outline.get('title') or '').strip(),
+        'introduction': list(outline.get('introduction') or []),
+        'sections': sections,
+        'conclusion': list(outline.get('conclusion') or []),
+    }
@@ -1,8 +1,23 @@
 """
 Utility module for loading and selecting appropriate prompts based on blog length
 """
-from .short_blog_prompt import get_short_blog_prompt
-from .long_blog_prompt import get_long_blog_prompt
+from .short_blog_prompt import render_short_blog_prompt
+from .long_blog_prompt import render_long_blog_prompt
+
+
+def is_long_form(blog_length):
+    """
+    Check whether the blog length selection asks for a Long Detailed post.
+    
+    Args:
+        blog_length (str): 'Short Form (500-800 words)' or 'Long Detailed (2000+ words)'
+    
+    Returns:
+        bool: True for long detailed posts, False for short form or unclear selections
+    """
+    if 'Short Form' in blog_length or '500-800' in blog_length:
+        return False
+    return 'Long Detailed' in blog_length or '2000+' in blog_length
 
 
 def load_prompt(blog_length, input_type, input_tone, input_language, input_keywords, serp_results):
@@ -18,17 +33,10 @@ def load_prompt(blog_length, input_type, input_tone, input_language, input_keywo
         serp_results: Search results from Exa/Metaphor
     
     Returns:
-        str: Formatted prompt string ready for LLM
+        StructuredPrompt: Static instruction prefix plus per-request suffix;
+        str(prompt) gives the full prompt text
     """
-    # Check if user selected Short Form blog
-    if 'Short Form' in blog_length or '500-800' in blog_length:
-        return get_short_blog_prompt(input_type, input_tone, input_language, input_keywords, serp_results)
-    
-    # Check if user selected Long Detailed blog
-    elif 'Long Detailed' in blog_length or '2000+' in blog_length:
-        return get_long_blog_prompt(input_type, input_tone, input_language, input_keywords, serp_results)
-    
-    # Default to short form if selection is unclear
-    else:
-        return get_short_blog_prompt(input_type, input_tone, input_language, input_keywords, serp_results)
-
+    # Long Detailed only when explicitly selected; default to short form if selection is unclear
+    if is_long_form(blog_length):
+        return render_long_blog_prompt(input_type, input_tone, input_language, input_keywords, serp_results)
+    return render_short_blog_prompt(input_type, input_tone, input_language, input_keywords, serp_results)
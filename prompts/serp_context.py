@@ -0,0 +1,178 @@
+"""
+SERP context compaction
+Splits search result pages into passages, ranks them against the blog keywords
+with BM25 and keeps the best passages that fit a per-length token budget.
+"""
+import math
+import re
+from collections import Counter
+
+from .prompt_loader import is_long_form
+
+
+# Token budgets for the research context inserted into each prompt
+SERP_TOKEN_BUDGETS = {
+    'short': 1500,
+    'long': 4000,
+}
+
+PASSAGE_MAX_WORDS = 120
+PASSAGE_MIN_WORDS = 20
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for Gemini prompts (about four characters per token).
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / 4))
+
+
+def _tokenize(text):
+    return [word.lower() for word in _WORD_RE.findall(text or "")]
+
+
+def _field(result, name):
+    if isinstance(result, dict):
+        return result.get(name)
+    return getattr(result, name, None)
+
+
+def split_passages(text, max_words=PASSAGE_MAX_WORDS, min_words=PASSAGE_MIN_WORDS):
+    """
+    Split page text into passages of roughly max_words words.
+
+    Short paragraphs are merged with their neighbours and long ones are cut
+    into max_words chunks so every passage carries a comparable amount of text.
+
+    Args:
+        text (str): Full page text
+        max_words (int): Upper bound on words per passage
+        min_words (int): Paragraphs shorter than this are merged forward
+
+    Returns:
+        list[str]: Passages in document order
+    """
+    passages = []
+    buffer = []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        words = paragraph.split()
+        if not words:
+            continue
+        buffer.extend(words)
+        if len(buffer) < min_words:
+            continue
+        while len(buffer) > max_words:
+            passages.append(" ".join(buffer[:max_words]))
+            buffer = buffer[max_words:]
+        if len(buffer) >= min_words:
+            passages.append(" ".join(buffer))
+            buffer = []
+    if buffer:
+        passages.append(" ".join(buffer))
+    return passages
+
+
+def bm25_scores(query, documents, k1=1.5, b=0.75):
+    """
+    Score documents against a query with Okapi BM25.
+
+    Args:
+        query (str): Search keywords
+        documents (list[str]): Passages to score
+        k1 (float): Term frequency saturation
+        b (float): Length normalisation strength
+
+    Returns:
+        list[float]: One score per document
+    """
+    tokenized = [_tokenize(doc) for doc in documents]
+    if not tokenized:
+        return []
+    avg_len = sum(len(doc) for doc in tokenized) / len(tokenized) or 1.0
+    doc_freq = Counter(term for doc in tokenized for term in set(doc))
+    query_terms = set(_tokenize(query))
+    total = len(tokenized)
+
+    scores = []
+    for doc in tokenized:
+        counts = Counter(doc)
+        score = 0.0
+        for term in query_terms:
+            tf = counts.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (total - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def compact_serp_results(serp_results, keywords, blog_length, token_budget=None):
+    """
+    Build a compact research context from raw search results.
+
+    Every source keeps its title and URL so the References section can cite
+    it; page text is reduced to the highest-ranked passages that fit the budget.
+
+    Args:
+        serp_results: Search results from Exa/Metaphor (dicts or result objects)
+        keywords (str): Main keywords/topic used for ranking
+        blog_length (str): Blog length selection, picks the default budget
+        token_budget (int): Optional override for the token budget
+
+    Returns:
+        tuple[str, dict]: Compacted context string and a report with
+        original_tokens, compacted_tokens, saved_tokens and passages_kept
+    """
+    if token_budget is None:
+        token_budget = SERP_TOKEN_BUDGETS['long' if is_long_form(blog_length) else 'short']
+
+    sources = []
+    candidates = []
+    for index, result in enumerate(serp_results or []):
+        title = _field(result, 'title') or "Untitled"
+        url = _field(result, 'url') or ""
+        header = f"[{index + 1}] {title} - {url}"
+        sources.append(header)
+        for position, passage in enumerate(split_passages(_field(result, 'text'))):
+            candidates.append((index, position, passage))
+
+    used_tokens = sum(estimate_tokens(header) for header in sources)
+    scores = bm25_scores(keywords, [passage for _, _, passage in candidates])
+    ranked = sorted(range(len(candidates)), key=lambda i: (-scores[i], candidates[i][:2]))
+
+    kept = {}
+    for i in ranked:
+        source_index, position, passage = candidates[i]
+        cost = estimate_tokens(passage)
+        if used_tokens + cost > token_budget:
+            continue
+        kept.setdefault(source_index, []).append((position, passage))
+        used_tokens += cost
+
+    blocks = []
+    for index, header in enumerate(sources):
+        passages = [passage for _, passage in sorted(kept.get(index, []))]
+        blocks.append("\n".join([header] + [f"- {passage}" for passage in passages]))
+    context = "\n\n".join(blocks)
+
+    original_tokens = estimate_tokens(str(serp_results))
+    compacted_tokens = estimate_tokens(context)
+    report = {
+        'original_tokens': original_tokens,
+        'compacted_tokens': compacted_tokens,
+        'saved_tokens': max(0, original_tokens - compacted_tokens),
+        'passages_kept': sum(len(passages) for passages in kept.values()),
+        'passages_total': len(candidates),
+    }
+    return context, report
@@ -1,32 +1,21 @@
 """
 Short Form Blog Prompt Template
-This is the current prompt extracted exactly as-is from blog_from_serp.py
-No modifications - preserves existing functionality
+The original blog_from_serp.py prompt, with the per-request details (type,
+tone, language, keywords, SERP results) moved after the static instructions
 """
+from .template_registry import register_template
 
 
-def get_short_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results):
-    """
-    Generate the short form blog prompt using the current prompt template.
-    
-    Args:
-        input_type (str): Blog post type (General, How-to Guides, etc.)
-        input_tone (str): Blog tone (Professional, Casual, etc.)
-        input_language (str): Language selection
-        input_blog_keywords (str): Main keywords/topic
-        serp_results: Search results from Exa/Metaphor
-    
-    Returns:
-        str: Formatted prompt string ready for LLM
-    """
-    prompt = f"""
-        You are ALwrity, an experienced SEO strategist and creative content writer who specializes in crafting {input_type} blog posts in {input_language}. Your blog posts are designed to rank highly in search results while deeply engaging readers with a professional yet personable tone.
+SHORT_BLOG_TEMPLATE = register_template(
+    'short_blog',
+    prefix="""
+        You are ALwrity, an experienced SEO strategist and creative content writer who specializes in crafting blog posts of the type and in the language given in the Blog Details below. Your blog posts are designed to rank highly in search results while deeply engaging readers with a professional yet personable tone.
 
         ### Task:
-        Write a comprehensive, engaging, and SEO-optimized blog post on the topic below. The blog should:
+        Write a comprehensive, engaging, and SEO-optimized blog post on the topic given in the Blog Details below. The blog should:
         - Be structured for readability with clear headings, subheadings, and bullet points.
         - Include actionable insights, real-world examples, and personal anecdotes to make the content relatable and practical.
-        - Be written in a {input_tone} tone that balances professionalism with a conversational style.
+        - Be written in the tone given in the Blog Details, balancing professionalism with a conversational style.
 
         ### Requirements:
         1. **SEO Optimization**:
@@ -67,20 +56,56 @@ def get_short_blog_prompt(input_type, input_tone, input_language, input_blog_key
            - Use the actual URLs from the search results provided
            - Format as numbered list: [Article Title] - [URL]
            - Include only the article title and clickable link
-           
+
         7. **SEO Metadata**:
            - Append the following metadata after the main blog content:
              - A **Blog Title** that is catchy and includes the primary keyword.
              - A **Meta Description** summarizing the blog post in under 160 characters.
              - A **URL Slug** that is short, descriptive, and formatted in lowercase with hyphens.
              - A list of **Hashtags** relevant to the content.
-
+        """,
+    suffix="""
         ### Blog Details:
+        - **Blog Post Type**: {input_type}
+        - **Language**: {input_language} (write the entire blog post in this language)
+        - **Tone**: {input_tone}
         - **Title**: {input_blog_keywords}
         - **Keywords**: {input_blog_keywords}
         - **Google SERP Results**: {serp_results}
 
-        Now, craft an exceptional blog post that stands out in search results and delivers maximum value to readers.
-        """
-    return prompt
+        Now, craft an exceptional {input_type} blog post in {input_language} that stands out in search results and delivers maximum value to readers.
+        """,
+)
+
+
+def render_short_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results):
+    """
+    Render the short form template as a structured prompt.
 
+    Returns:
+        StructuredPrompt: Static instruction prefix plus per-request suffix
+    """
+    return SHORT_BLOG_TEMPLATE.render(
+        input_type=input_type,
+        input_tone=input_tone,
+        input_language=input_language,
+        input_blog_keywords=input_blog_keywords,
+        serp_results=serp_results,
+    )
+
+
+def get_short_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results):
+    """
+    Generate the short form blog prompt using the current prompt template.
+    
+    Args:
+        input_type (str): Blog post type (General, How-to Guides, etc.)
+        input_tone (str): Blog tone (Professional, Casual, etc.)
+        input_language (str): Language selection
+        input_blog_keywords (str): Main keywords/topic
+        serp_results: Search results from Exa/Metaphor
+    
+    Returns:
+        str: Formatted prompt string ready for LLM
+    """
+    return render_short_blog_prompt(input_type, input_tone, input_language, input_blog_keywords, serp_results).text
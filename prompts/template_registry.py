@@ -0,0 +1,95 @@
+"""
+Prompt template registry
+Templates are compiled once at import time and split into an invariant
+instruction prefix and a per-request suffix, so the shared prefix can be
+reused across requests through Gemini context caching
+"""
+import hashlib
+import textwrap
+from string import Formatter
+
+
+class StructuredPrompt:
+    """
+    A rendered prompt made of a static prefix and a variable suffix.
+
+    str(prompt) returns the full prompt text, so it can be used anywhere a
+    plain prompt string was expected.
+    """
+
+    __slots__ = ('template_name', 'prefix', 'suffix', 'prefix_hash')
+
+    def __init__(self, template_name, prefix, suffix, prefix_hash):
+        self.template_name = template_name
+        self.prefix = prefix
+        self.suffix = suffix
+        self.prefix_hash = prefix_hash
+
+    @property
+    def text(self):
+        return self.prefix + self.suffix
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"StructuredPrompt({self.template_name!r}, prefix={len(self.prefix)} chars, suffix={len(self.suffix)} chars)"
+
+
+class PromptTemplate:
+    """
+    A compiled prompt template.
+
+    Args:
+        name (str): Registry name of the template
+        prefix (str): Static instructions; must not contain any fields
+        suffix (str): Per-request part with str.format style {fields}
+    """
+
+    def __init__(self, name, prefix, suffix):
+        self.name = name
+        self.prefix = textwrap.dedent(prefix).strip() + "\n\n"
+        if any(field for _, field, _, _ in Formatter().parse(self.prefix)):
+            raise ValueError(f"Prompt template {name!r} has fields in its static prefix")
+        self.prefix_hash = hashlib.sha256(self.prefix.encode('utf-8')).hexdigest()
+        # Pre-parse the suffix into (literal, field) pieces so rendering is a plain join
+        self._pieces = [
+            (literal, field)
+            for literal, field, _, _ in Formatter().parse(textwrap.dedent(suffix).strip() + "\n")
+        ]
+        self.fields = frozenset(field for _, field in self._pieces if field)
+
+    def render(self, **values):
+        """
+        Fill the suffix fields and return a StructuredPrompt.
+
+        Raises:
+            KeyError: If a field used by the template is missing from values
+        """
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"Prompt template {self.name!r} is missing values for: {', '.join(sorted(missing))}")
+        parts = []
+        for literal, field in self._pieces:
+            parts.append(literal)
+            if field:
+                parts.append(str(values[field]))
+        return StructuredPrompt(self.name, self.prefix, "".join(parts), self.prefix_hash)
+
+
+_TEMPLATES = {}
+
+
+def register_template(name, prefix, suffix):
+    """Compile a template and add it to the registry; returns the compiled template."""
+    template = PromptTemplate(name, prefix, suffix)
+    _TEMPLATES[name] = template
+    return template
+
+
+def get_template(name):
+    """Return a registered template by name."""
+    try:
+        return _TEMPLATES[name]
+    except KeyError:
+        raise KeyError(f"Unknown prompt template: {name!r}") from None
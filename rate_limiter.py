@@ -0,0 +1,182 @@
+"""
+Host-wide rate limiting and backoff for Gemini calls.
+
+Each (API key, model) pair has a token bucket stored in the shared SQLite
+cache file, so every Streamlit session and worker process on the host draws
+from the same budget. Buckets use GCRA reservations: each caller atomically
+books the next free slot and sleeps until it, so waiting callers are served
+in arrival order. On 429 responses the bucket is pushed back by the
+server's retry hint so all sessions slow down together.
+"""
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+import metrics
+from disk_cache import DEFAULT_CACHE_PATH
+
+
+# Requests per minute per API key. No bucket is limited by default, since paid
+# keys allow far more than the free tier. Enable limits with e.g.
+# ALWRITY_RATE_LIMITS="free-tier" or "gemini-2.5-flash=10,exa=60"; presets and
+# per-bucket values can be combined ("free-tier,exa=60"), and 0 disables a bucket.
+DEFAULT_RATE_LIMITS = {}
+RATE_LIMIT_PRESETS = {
+    "free-tier": {
+        "gemini-2.5-flash-lite": 15,
+        "gemini-2.5-flash": 10,
+        "gemini-2.5-pro": 5,
+    },
+}
+RATE_LIMIT_BURST = int(os.getenv("ALWRITY_RATE_LIMIT_BURST", "3"))
+# Longest a caller will queue for a slot or sleep on a retry hint before
+# moving on to the next fallback model instead
+MAX_WAIT_SECONDS = float(os.getenv("ALWRITY_RATE_LIMIT_MAX_WAIT", "30"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 20.0
+
+_RETRY_HINT_PATTERNS = (
+    re.compile(r"retry[_ ]?delay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    re.compile(r"retry[- ]after['\"]?\s*[:=]?\s*(\d+(?:\.\d+)?)", re.IGNORECASE),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when the next slot is further away than the caller is willing to wait."""
+
+
+def _parse_limits(spec):
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name in RATE_LIMIT_PRESETS and not value.strip():
+            limits.update(RATE_LIMIT_PRESETS[name])
+        elif name and value.strip():
+            limits[name] = float(value)
+    return limits
+
+
+class RateLimiter:
+    """GCRA token buckets persisted in SQLite and shared across processes."""
+
+    def __init__(self, path=None, limits=None, burst=RATE_LIMIT_BURST):
+        self.path = path or DEFAULT_CACHE_PATH
+        self.limits = limits if limits is not None else _parse_limits(os.getenv("ALWRITY_RATE_LIMITS"))
+        self.burst = max(1, burst)
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (bucket TEXT PRIMARY KEY, tat REAL NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def bucket_name(api_key, name):
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] + ":" + name
+
+    def _update(self, bucket, compute):
+        """Run compute(now, tat) -> (new_tat, result) inside a write transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE bucket = ?", (bucket,)).fetchone()
+            now = time.time()
+            new_tat, result = compute(now, row[0] if row else now)
+            if new_tat is not None:
+                conn.execute("INSERT OR REPLACE INTO rate_limits (bucket, tat) VALUES (?, ?)", (bucket, new_tat))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def acquire(self, api_key, name, max_wait=MAX_WAIT_SECONDS):
+        """Reserve the next slot for name under api_key and sleep until it; returns seconds waited."""
+        per_minute = self.limits.get(name)
+        if not per_minute:
+            return 0.0
+        interval = 60.0 / per_minute
+        tolerance = (self.burst - 1) * interval
+        bucket = self.bucket_name(api_key, name)
+
+        def reserve(now, tat):
+            tat = max(tat, now)
+            wait = max(0.0, tat - tolerance - now)
+            if wait > max_wait:
+                return None, -wait
+            return tat + interval, wait
+
+        wait = self._update(bucket, reserve)
+        if wait < 0:
+            metrics.increment("rate_limit_rejected_total", bucket=name)
+            raise RateLimitExceeded(f"{name}: next request slot is {-wait:.0f}s away (rate limit)")
+        if wait:
+            metrics.increment("rate_limit_waits_total", bucket=name)
+            metrics.observe("rate_limit_wait_seconds", wait, bucket=name)
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, api_key, name, seconds):
+        """Keep every caller off this bucket for the next `seconds` (e.g. a server retry hint)."""
+        per_minute = self.limits.get(name)
+        if not per_minute or seconds <= 0:
+            return
+        tolerance = (self.burst - 1) * 60.0 / per_minute
+        bucket = self.bucket_name(api_key, name)
+        self._update(bucket, lambda now, tat: (max(tat, now + seconds + tolerance), None))
+
+
+def retry_after_hint(err):
+    """Return the server-suggested retry delay in seconds, if the error carries one."""
+    response = getattr(err, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    message = f"{getattr(err, 'details', '')} {err}"
+    for pattern in _RETRY_HINT_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def backoff_delay(err, attempt):
+    """Seconds to wait before retry number attempt + 1.
+
+    A server hint is honoured with a little jitter on top; otherwise use
+    exponential backoff with equal jitter so concurrent sessions spread out.
+    """
+    hint = retry_after_hint(err)
+    if hint is not None:
+        return hint + random.uniform(0, min(1.0, 0.1 * hint) + 0.25)
+    ceiling = min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,129 @@
+"""
+Query expansion and near-duplicate removal for the research stage.
+
+A topic is expanded into a few sub-queries that are searched concurrently.
+The merged results often contain the same page under different URLs, or
+syndicated copies of one article. Exact copies are removed by canonical URL.
+Near-duplicates are removed by comparing bottom-k MinHash sketches of word
+shingles from the page text, so the prompt's token budget goes to distinct
+sources. A bottom-k sketch needs one hash per shingle instead of one per
+permutation, which keeps deduplication to a few milliseconds per page.
+"""
+import hashlib
+import heapq
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+RESEARCH_SUBQUERIES = int(os.getenv("ALWRITY_RESEARCH_SUBQUERIES", "3"))
+RESEARCH_MAX_SOURCES = int(os.getenv("ALWRITY_RESEARCH_MAX_SOURCES", "10"))
+# Estimated Jaccard similarity of page shingles above which two pages count as copies
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("ALWRITY_NEAR_DUPLICATE_THRESHOLD", "0.7"))
+
+SHINGLE_WORDS = 5
+# Shingle hashes kept per page
+MINHASH_SIZE = 64
+# Only the start of each page is shingled; copies diverge little there and long pages stay cheap
+MINHASH_MAX_WORDS = 1000
+
+# Sub-query templates by blog type; the first entries are used first
+_EXPANSIONS = {
+    'How-to Guides': ["{topic} step by step", "{topic} common mistakes", "{topic} tools and tips", "{topic} for beginners"],
+    'Listicles': ["best {topic}", "{topic} examples", "{topic} ideas", "{topic} statistics"],
+    'Job Posts': ["{topic} job description", "{topic} skills and requirements", "{topic} salary", "{topic} interview questions"],
+    'Cheat Sheets': ["{topic} quick reference", "{topic} commands and shortcuts", "{topic} best practices", "{topic} examples"],
+}
+_DEFAULT_EXPANSIONS = ["{topic} guide", "{topic} examples and case studies", "{topic} statistics and research",
+                       "{topic} best practices"]
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|source)$", re.IGNORECASE)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def expand_queries(keywords, blog_type=None, max_subqueries=RESEARCH_SUBQUERIES):
+    """Return the original query followed by up to max_subqueries related queries."""
+    topic = " ".join(keywords.split())
+    queries = [topic]
+    for template in _EXPANSIONS.get(blog_type, _DEFAULT_EXPANSIONS)[:max(0, max_subqueries)]:
+        query = template.format(topic=topic)
+        if query.lower() not in (existing.lower() for existing in queries):
+            queries.append(query)
+    return queries
+
+
+def canonical_url(url):
+    """Normalise a URL so trivially different links to one page compare equal."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(key)))
+    path = parts.path.rstrip("/") or "/"
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def _shingles(text):
+    words = [word.lower() for word in _WORD_RE.findall(text or "")[:MINHASH_MAX_WORDS]]
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash_signature(text):
+    """Bottom-k MinHash sketch of the page's word shingles; None if the page has no text.
+
+    The sketch is the set of the MINHASH_SIZE smallest shingle hashes.
+    """
+    hashes = {
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in _shingles(text)
+    }
+    if not hashes:
+        return None
+    return frozenset(heapq.nsmallest(MINHASH_SIZE, hashes))
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two bottom-k sketches.
+
+    Among the k smallest hashes of both sketches combined, the fraction
+    present in both.
+    """
+    if signature_a is None or signature_b is None:
+        return 0.0
+    union = signature_a | signature_b
+    smallest = heapq.nsmallest(min(MINHASH_SIZE, len(union)), union)
+    return sum(h in signature_a and h in signature_b for h in smallest) / len(smallest)
+
+
+def interleave_results(result_lists):
+    """Merge per-query result lists round-robin, so every query's top hits come first."""
+    merged = []
+    for rank in range(max((len(results) for results in result_lists), default=0)):
+        merged.extend(results[rank] for results in result_lists if rank < len(results))
+    return merged
+
+
+def dedupe_results(results, threshold=NEAR_DUPLICATE_THRESHOLD, max_sources=RESEARCH_MAX_SOURCES):
+    """Drop repeated URLs and near-duplicate pages, keeping the first of each group.
+
+    Returns the kept results (at most max_sources) and a report with
+    url_duplicates and near_duplicates counts.
+    """
+    kept, signatures, seen_urls = [], [], set()
+    url_duplicates = near_duplicates = 0
+    for result in results:
+        url = canonical_url(result.get('url'))
+        if url in seen_urls:
+            url_duplicates += 1
+            continue
+        seen_urls.add(url)
+        signature = minhash_signature(result.get('text'))
+        if any(estimate_similarity(signature, other) >= threshold for other in signatures):
+            near_duplicates += 1
+            continue
+        kept.append(result)
+        signatures.append(signature)
+        if len(kept) >= max_sources:
+            break
+    return kept, {'url_duplicates': url_duplicates, 'near_duplicates': near_duplicates}
@@ -0,0 +1,167 @@
+"""
+Content-addressed cache of generated posts with single-flight coalescing.
+
+Posts are keyed by a hash of the fully assembled prompt and the model list.
+While one generation for a key is in flight, identical requests from other
+sessions wait for it instead of starting their own Gemini call.
+"""
+import os
+import threading
+from contextlib import nullcontext
+
+import metrics
+from disk_cache import DiskCache, make_cache_key
+from llm_client import FALLBACK_MODELS, STREAM_RESET, generate_with_fallback, stream_with_fallback
+
+
+# Set ALWRITY_RESULT_CACHE_DISABLED=1 to always call Gemini
+result_cache = DiskCache(
+    "generated_posts",
+    ttl_seconds=int(os.getenv("ALWRITY_RESULT_CACHE_TTL", str(6 * 3600))),
+    max_entries=int(os.getenv("ALWRITY_RESULT_CACHE_MAX_ENTRIES", "200")),
+)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Lets one caller per key do the work while concurrent callers wait for its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Return (call, is_leader). The leader must call finish() exactly once."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        call.result = result
+        call.error = error
+        with self._lock:
+            self._calls.pop(key, None)
+        call.done.set()
+
+    @staticmethod
+    def wait(call):
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with the same key."""
+        call, is_leader = self.begin(key)
+        if not is_leader:
+            metrics.increment("alwrity_coalesced_requests_total")
+            return self.wait(call)
+        try:
+            result = fn()
+        except Exception as err:
+            self.finish(key, call, error=err)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+
+_flights = SingleFlight()
+
+
+def _enabled():
+    return os.getenv("ALWRITY_RESULT_CACHE_DISABLED") != "1"
+
+
+def result_key(prompt, models=None):
+    return make_cache_key("generated_post", str(prompt), list(models or FALLBACK_MODELS))
+
+
+def generate_cached(prompt, api_key, models=None, validate=None, gemini_slots=None, **kwargs):
+    """generate_with_fallback behind the result cache and single-flight coalescing.
+
+    validate(text), when given, runs before the text is cached; if it raises,
+    nothing is cached and the error propagates, so a malformed response is
+    not replayed to later callers. gemini_slots, when given, is a semaphore
+    held around the Gemini call only, so cache hits never wait for a slot.
+    """
+    if not _enabled():
+        with gemini_slots or nullcontext():
+            text = generate_with_fallback(prompt, api_key, models=models, **kwargs)
+        if validate is not None:
+            validate(text)
+        return text
+
+    with metrics.timed_stage("generate") as stage:
+        key = result_key(prompt, models)
+        cached = result_cache.get(key)
+        metrics.record_cache("result", cached is not None)
+        stage["cached"] = cached is not None
+        if cached is not None:
+            return cached
+
+        def generate():
+            with gemini_slots or nullcontext():
+                text = generate_with_fallback(prompt, api_key, models=models, **kwargs)
+            if validate is not None:
+                validate(text)
+            if text:
+                result_cache.set(key, text)
+            return text
+
+        return _flights.do(key, generate)
+
+
+def stream_cached(prompt, api_key, models=None, stats=None, **kwargs):
+    """stream_with_fallback behind the result cache and single-flight coalescing.
+
+    Cache hits and coalesced requests yield the whole post as one chunk and
+    set stats["cached"] to True.
+    """
+    if stats is None:
+        stats = {}
+    if not _enabled():
+        yield from stream_with_fallback(prompt, api_key, models=models, stats=stats, **kwargs)
+        return
+
+    key = result_key(prompt, models)
+    cached = result_cache.get(key)
+    metrics.record_cache("result", cached is not None)
+    if cached is not None:
+        stats.update(cached=True, model="cache", time_to_first_token=0.0, total_seconds=0.0)
+        yield cached
+        return
+
+    call, is_leader = _flights.begin(key)
+    if not is_leader:
+        metrics.increment("alwrity_coalesced_requests_total")
+        text = _flights.wait(call)
+        stats.update(cached=True, model="in-flight request", time_to_first_token=0.0, total_seconds=0.0)
+        yield text
+        return
+
+    chunks = []
+    try:
+        for chunk in stream_with_fallback(prompt, api_key, models=models, stats=stats, **kwargs):
+            if chunk is STREAM_RESET:
+                chunks = []
+            else:
+                chunks.append(chunk)
+            yield chunk
+    except BaseException as err:
+        # GeneratorExit (consumer stopped reading) must release waiting followers too
+        _flights.finish(key, call, error=err if isinstance(err, Exception) else RuntimeError("Generation abandoned"))
+        raise
+    text = "".join(chunks)
+    if text:
+        result_cache.set(key, text)
+    stats["cached"] = False
+    _flights.finish(key, call, result=text)